@@ -1,32 +1,426 @@
+import functools
+import os
+import queue
+import threading
 from datetime import datetime
 
-from flask import Flask, request, jsonify, json
+from flask import Flask, Response, request, jsonify, json
 from flask_cors import CORS, cross_origin
 import numpy
 
+from backtracking import BacktrackingSudokuSolver
+from cooling import build_cooling_schedule, build_reheat_policy
+from generator import DIFFICULTIES, generate_many
+from engines import SOLVER_ENGINES
+from jobs import JobManager, solve_batch
 from simulated_annealing import SimulatedAnnealingSudokuSolver
-from sudoku import Sudoku
+from solution_cache import SolutionCache, CanonicalForm, canonical_form
+from stats import SolverMetrics
+from stochastic import StochasticSudokuSolver
+from sudoku import Sudoku, get_layout
 
 import time
 
 app = Flask(__name__)
 CORS(app)
 
+# solucoes ja encontradas, compartilhadas entre Sudokus equivalentes
+solution_cache: SolutionCache = SolutionCache(max_entries=4096)
+
+# resolucoes assincronas, executadas em processos separados dos workers HTTP
+job_manager: JobManager = JobManager(max_workers=int(os.environ.get("SUDOKU_JOB_WORKERS", os.cpu_count() or 1)))
+
+# contadores agregados das resolucoes feitas neste processo, exportados em /metrics
+solver_metrics: SolverMetrics = SolverMetrics()
+
+# tempo maximo, e padrao, de uma resolucao sincrona, abaixo do timeout de 180s do gunicorn definido no Procfile
+MAX_TIME_BUDGET: float = float(os.environ.get("SUDOKU_MAX_TIME_BUDGET", 150))
+
+# tempo maximo, e padrao, de uma resolucao assincrona em /jobs. Os jobs nao estao sujeitos ao timeout do gunicorn, mas
+# sem limite um Sudoku sem solucao ocuparia um processo de job_manager indefinidamente
+MAX_JOB_TIME_BUDGET: float = float(os.environ.get("SUDOKU_MAX_JOB_TIME_BUDGET", 600))
+
+# quantidade maxima de cadeias independentes de /solve. Todas compartilham o mesmo limite de tempo, e cadeias alem da
+# quantidade de nucleos apenas disputam o processador
+MAX_CHAINS: int = int(os.environ.get("SUDOKU_MAX_CHAINS", os.cpu_count() or 1))
+
+# tempo maximo da contagem de solucoes em /validate, acima dele a unicidade e informada como desconhecida
+MAX_VALIDATE_TIME_BUDGET: float = float(os.environ.get("SUDOKU_MAX_VALIDATE_TIME_BUDGET", 5))
+
+# quantidade maxima de Sudokus resolvidos por requisicao em /solve/batch
+MAX_BATCH_SIZE: int = int(os.environ.get("SUDOKU_MAX_BATCH_SIZE", 1000))
+
+# quantidade maxima de Sudokus gerados por requisicao em /generate
+MAX_GENERATE_COUNT: int = int(os.environ.get("SUDOKU_MAX_GENERATE_COUNT", 1000))
+
+# tempo maximo, e padrao, da geracao de cada Sudoku em /generate e de cada verificacao de unicidade feita durante ela.
+# Sem esses limites a remocao de celulas de um Sudoku de ordem 4 pode levar muitos minutos
+MAX_GENERATE_TIME_BUDGET: float = float(os.environ.get("SUDOKU_MAX_GENERATE_TIME_BUDGET", 10))
+GENERATE_CHECK_TIME_BUDGET: float = float(os.environ.get("SUDOKU_GENERATE_CHECK_TIME_BUDGET", 0.5))
+
+
+@app.errorhandler(ValueError)
+def handle_invalid_request(error: ValueError):
+    return jsonify({"error": str(error)}), 400
+
+
+def build_solver_factory(max_time_budget: float = None):
+    """ Monta, a partir dos parametros da requisicao, a funcao que cria o solucionador escolhido para um Sudoku. A
+    funcao pode ser enviada para outros processos, pois e uma aplicacao parcial da classe do solucionador
+    :param max_time_budget: tempo maximo de resolucao, em segundos, utilizado tambem quando a requisicao nao informa
+    time_budget. None permite resolucoes sem limite de tempo
+    :return solver_factory: funcao que recebe um Sudoku e retorna o solucionador configurado
+    """
+
+    engine: str = request.args.get("engine", default="annealing")
+    if engine not in SOLVER_ENGINES:
+        raise ValueError("engine desconhecida: {}".format(engine))
+
+    options = dict()
+    time_budget: float = request.args.get("time_budget", default=max_time_budget, type=float)
+    if time_budget is not None:
+        if time_budget <= 0:
+            raise ValueError("time_budget deve ser positivo")
+        options["time_budget"] = min(time_budget, max_time_budget) if max_time_budget is not None else time_budget
+    if "max_iterations" in request.args:
+        options["max_iterations"] = request.args.get("max_iterations", type=int)
+
+    if engine == "annealing":
+        if request.args.get("initial_temperature", default="auto") != "auto":
+            options["initial_temperature"] = request.args.get("initial_temperature", type=float)
+        if "calibration_acceptance" in request.args:
+            options["calibration_acceptance"] = request.args.get("calibration_acceptance", type=float)
+        if "greedy_first_state" in request.args:
+            options["greedy_first_state"] = request.args.get("greedy_first_state") in ("1", "true")
+        if "move_policy" in request.args:
+            options["move_policy"] = request.args["move_policy"]
+        if "cooling" in request.args:
+            options["cooling_schedule"] = build_cooling_schedule(request.args["cooling"], request.args)
+        if "reheat" in request.args:
+            options["reheat_policy"] = build_reheat_policy(request.args["reheat"], request.args)
+
+    if engine == "tempering":
+        if "replicas" in request.args:
+            options["replicas"] = request.args.get("replicas", type=int)
+        if "min_temperature" in request.args:
+            options["min_temperature"] = request.args.get("min_temperature", type=float)
+        if "max_temperature" in request.args:
+            options["max_temperature"] = request.args.get("max_temperature", type=float)
+        if "exchange_interval" in request.args:
+            options["exchange_interval"] = request.args.get("exchange_interval", type=int)
+
+    if issubclass(SOLVER_ENGINES[engine], StochasticSudokuSolver):
+        if "seed" in request.args:
+            options["seed"] = request.args.get("seed", type=int)
+        if "timings" in request.args:
+            options["collect_timings"] = request.args.get("timings") in ("1", "true")
+
+    return functools.partial(SOLVER_ENGINES[engine], **options)
+
+
+# formatos aceitos no corpo das requisicoes (Content-Type) e nas respostas (Accept): a lista de submatrizes em JSON, o
+# texto compacto com um caractere por celula e o formato binario com um byte por celula
+WIRE_FORMATS = ["application/json", "text/plain", "application/octet-stream"]
+
+
+def read_sudoku() -> Sudoku:
+    """ Le o Sudoku do corpo da requisicao no formato indicado pelo Content-Type. Os formatos compactos sao convertidos
+    diretamente para o vetor de celulas, sem passar por listas aninhadas
+    :param None
+    :return sudoku: Sudoku recebido
+    """
+
+    if request.mimetype == "text/plain":
+        return Sudoku.from_string(request.get_data(as_text=True).strip())
+    if request.mimetype == "application/octet-stream":
+        return Sudoku.from_bytes(request.get_data())
+    return Sudoku(numpy.asarray(request.get_json()))
+
+
+def sudoku_response(sudoku: Sudoku, headers: dict = None) -> Response:
+    """ Monta a resposta com um Sudoku no formato negociado pelo cabecalho Accept, por padrao a lista de submatrizes
+    :param sudoku: Sudoku respondido
+    :param headers: cabecalhos adicionais da resposta
+    :return response: resposta HTTP
+    """
+
+    mimetype: str = request.accept_mimetypes.best_match(WIRE_FORMATS, default="application/json")
+    if mimetype == "text/plain":
+        return Response(sudoku.to_string(), mimetype=mimetype, headers=headers)
+    if mimetype == "application/octet-stream":
+        return Response(sudoku.to_bytes(), mimetype=mimetype, headers=headers)
+    response: Response = jsonify([board.tolist() for board in sudoku.boards])
+    response.headers.extend(headers or {})
+    return response
+
+
+def invalid_sudoku_response(sudoku: Sudoku):
+    """ Monta a resposta de erro para um Sudoku cujas celulas fornecidas ja estao em conflito, evitando que a
+    resolucao consuma todo o tempo disponivel sem nunca encontrar uma solucao
+    :param sudoku: Sudoku recebido
+    :return response: tupla (corpo, status) com os conflitos encontrados, ou None caso o Sudoku seja valido
+    """
+
+    if sudoku.is_valid():
+        return None
+    return jsonify({"error": "o Sudoku possui digitos repetidos", "conflicts": sudoku.find_conflicts()}), 400
+
+
+@app.route('/validate', methods=["POST"])
+@cross_origin()
+def validate():
+    sudoku: Sudoku = read_sudoku()
+
+    conflicts = sudoku.find_conflicts()
+    result = {"valid": not conflicts, "conflicts": conflicts}
+    # a contagem de solucoes e opcional, pois ao contrario da verificacao de conflitos exige uma busca completa
+    if request.args.get("solutions") in ("1", "true"):
+        time_budget: float = min(
+            request.args.get("time_budget", default=MAX_VALIDATE_TIME_BUDGET, type=float), MAX_VALIDATE_TIME_BUDGET
+        )
+        if time_budget <= 0:
+            raise ValueError("time_budget deve ser positivo")
+        solutions_count = BacktrackingSudokuSolver(sudoku).count_solutions(limit=2, time_budget=time_budget)
+        result["solutions"] = {None: "unknown", 0: "none", 1: "unique", 2: "multiple"}[solutions_count]
+    return jsonify(result)
+
+
 @app.route('/solve', methods=["POST"])
 @cross_origin()
 def process():
-    data = numpy.asarray(request.get_json())
+    sudoku: Sudoku = read_sudoku()
+    invalid = invalid_sudoku_response(sudoku)
+    if invalid is not None:
+        return invalid
+
+    # o solucionador e criado antes da consulta ao cache para que opcoes invalidas, verificadas apenas no seu
+    # construtor, sejam rejeitadas mesmo quando a solucao ja esta no cache
+    solver = build_solver_factory(MAX_TIME_BUDGET)(sudoku)
+    chains: int = request.args.get("chains", default=1, type=int)
+    if not 1 <= chains <= MAX_CHAINS:
+        raise ValueError("chains deve estar entre 1 e {}".format(MAX_CHAINS))
 
-    sudoku: Sudoku = Sudoku(data)
+    details: bool = request.args.get("details") in ("1", "true")
 
-    sa: SimulatedAnnealingSudokuSolver = SimulatedAnnealingSudokuSolver(sudoku)
+    form: CanonicalForm = canonical_form(sudoku)
+    cached_solution: Sudoku = solution_cache.get(form)
+    if cached_solution is not None:
+        boards = [board.tolist() for board in cached_solution.boards]
+        if details:
+            return jsonify(
+                {"boards": boards, "score": 1.0, "solved": True, "cached": True, "seed": None, "stats": None}
+            )
+        return sudoku_response(cached_solution, {"X-Solver-Solved": "true"})
 
-    solved, score = sa.solve()
+    if chains > 1 and isinstance(solver, SimulatedAnnealingSudokuSolver):
+        solved, score = solver.solve_parallel(chains)
+    else:
+        solved, score = solver.solve()
+
+    solver_metrics.record(request.args.get("engine", default="annealing"), solver.stats, score == 1)
+    if score == 1:
+        solution_cache.put(form, solved.sudoku_problem)
 
     res = []
     for board in solved.sudoku_problem.boards:
         res.append(board.tolist())
-    return jsonify(res)
+    # a semente permite reproduzir a resolucao repetindo a requisicao com o parametro seed. Com varias cadeias, e a
+    # semente da cadeia vencedora, que reproduz o resultado com chains=1
+    seed = solver.stats.seed
+    # quando o tempo ou as iteracoes se esgotam, o melhor tabuleiro obtido e retornado com solved falso
+    solved_flag: bool = score == 1
+    if details:
+        stats = solver.stats.to_dict()
+        return jsonify(
+            {"boards": res, "score": score, "solved": solved_flag, "cached": False, "seed": seed, "stats": stats}
+        )
+    headers = {"X-Solver-Solved": str(solved_flag).lower()}
+    if seed is not None:
+        headers["X-Solver-Seed"] = str(seed)
+    return sudoku_response(solved.sudoku_problem, headers)
+
+
+@app.route('/solve/stream', methods=["POST"])
+@cross_origin()
+def process_stream():
+    sudoku: Sudoku = read_sudoku()
+    invalid = invalid_sudoku_response(sudoku)
+    if invalid is not None:
+        return invalid
+
+    solver_factory = build_solver_factory(MAX_TIME_BUDGET)
+
+    engine: str = request.args.get("engine", default="annealing")
+    interval: float = request.args.get("interval", default=0.5, type=float)
+    solver = solver_factory(sudoku)
+    events: queue.Queue = queue.Queue()
+
+    def run_solver():
+        try:
+            if isinstance(solver, StochasticSudokuSolver):
+                solved, score = solver.solve(progress_callback=events.put, progress_interval=interval)
+            else:
+                solved, score = solver.solve(progress_callback=events.put)
+            solver_metrics.record(engine, solver.stats, score == 1)
+            boards = [board.tolist() for board in solved.sudoku_problem.boards]
+            events.put((
+                "result", {"score": score, "solved": score == 1, "boards": boards, "stats": solver.stats.to_dict()}
+            ))
+        except Exception as error:
+            events.put(("error", {"error": str(error)}))
+
+    def stream_events():
+        while True:
+            event = events.get()
+            name, payload = event if isinstance(event, tuple) else ("progress", event)
+            yield "event: {}\ndata: {}\n\n".format(name, json.dumps(payload))
+            if name != "progress":
+                break
+
+    threading.Thread(target=run_solver, daemon=True).start()
+    return Response(
+        stream_events(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def check_batch_size(batch_size: int):
+    """ Verifica a quantidade de Sudokus recebidos em /solve/batch
+    :param batch_size: quantidade de Sudokus do lote
+    :return None, lanca ValueError caso o lote esteja vazio ou exceda MAX_BATCH_SIZE
+    """
+
+    if not 1 <= batch_size <= MAX_BATCH_SIZE:
+        raise ValueError("o lote deve conter entre 1 e {} Sudokus".format(MAX_BATCH_SIZE))
+
+
+@app.route('/solve/batch', methods=["POST"])
+@cross_origin()
+def process_batch():
+    # nos formatos compactos o corpo traz um Sudoku em texto por linha, ou os Sudokus binarios concatenados, todos da
+    # ordem informada no parametro order, e as respostas trazem o tabuleiro em texto no campo cells
+    compact: bool = request.mimetype in ("text/plain", "application/octet-stream")
+    # o tamanho do lote e verificado antes da leitura dos Sudokus, que tambem custa tempo em lotes muito grandes
+    if request.mimetype == "text/plain":
+        lines = [line.strip() for line in request.get_data(as_text=True).splitlines()]
+        lines = [line for line in lines if line]
+        check_batch_size(len(lines))
+        sudokus = [Sudoku.from_string(line) for line in lines]
+    elif request.mimetype == "application/octet-stream":
+        data: bytes = request.get_data()
+        cells_count: int = get_layout(request.args.get("order", default=3, type=int)).cells_count
+        if len(data) % cells_count != 0:
+            raise ValueError("o corpo deve conter Sudokus de {} bytes".format(cells_count))
+        check_batch_size(len(data) // cells_count)
+        sudokus = [Sudoku.from_bytes(data[start:start + cells_count]) for start in range(0, len(data), cells_count)]
+    else:
+        data = request.get_json()
+        if not isinstance(data, list):
+            return jsonify({"error": "o corpo deve ser uma lista de Sudokus"}), 400
+        check_batch_size(len(data))
+        sudokus = [Sudoku(numpy.asarray(boards)) for boards in data]
+
+    invalid_indexes = [index for index, sudoku in enumerate(sudokus) if not sudoku.is_valid()]
+    if invalid_indexes:
+        return jsonify({"error": "Sudokus com digitos repetidos", "invalid": invalid_indexes}), 400
+
+    # cada Sudoku do lote tem o mesmo limite de tempo de uma resolucao sincrona
+    solver_factory = build_solver_factory(MAX_TIME_BUDGET)
+
+    processes: int = request.args.get("processes", default=None, type=int)
+
+    def stream_results():
+        for index, cells, score in solve_batch(solver_factory, sudokus, processes):
+            result = {"index": index, "score": score, "solved": score == 1}
+            if compact:
+                result["cells"] = Sudoku.from_cells(cells).to_string()
+            else:
+                result["boards"] = [board.tolist() for board in Sudoku.from_cells(cells).boards]
+            yield json.dumps(result) + "\n"
+
+    return Response(stream_results(), mimetype="application/x-ndjson")
+
+
+@app.route('/generate', methods=["GET"])
+@cross_origin()
+def generate():
+    count: int = request.args.get("count", default=1, type=int)
+    if not 1 <= count <= MAX_GENERATE_COUNT:
+        raise ValueError("count deve estar entre 1 e {}".format(MAX_GENERATE_COUNT))
+    # a partir da ordem 5 nem a geracao do tabuleiro completo pelo backtracking cabe em uma requisicao. Na ordem 4 a
+    # geracao so termina por causa dos limites de tempo, e os Sudokus gerados ficam com mais celulas preenchidas
+    order: int = request.args.get("order", default=3, type=int)
+    if not 2 <= order <= 4:
+        raise ValueError("order deve estar entre 2 e 4")
+    difficulty: str = request.args.get("difficulty")
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError(
+            "dificuldade desconhecida: {}, utilize uma entre {}".format(difficulty, ", ".join(DIFFICULTIES))
+        )
+
+    options = {
+        "order": order,
+        "difficulty": difficulty,
+        "min_clues": request.args.get("min_clues", default=0, type=int),
+        "symmetric": request.args.get("symmetric") in ("1", "true"),
+        "time_budget": min(
+            request.args.get("time_budget", default=MAX_GENERATE_TIME_BUDGET, type=float), MAX_GENERATE_TIME_BUDGET
+        ),
+        "check_time_budget": GENERATE_CHECK_TIME_BUDGET,
+    }
+    if options["time_budget"] <= 0:
+        raise ValueError("time_budget deve ser positivo")
+    seed: int = request.args.get("seed", default=None, type=int)
+    processes: int = request.args.get("processes", default=None, type=int)
+    # no formato compacto os tabuleiros sao enviados em texto, com um caractere por celula
+    compact: bool = request.args.get("format", default="boards") == "string"
+
+    def stream_puzzles():
+        for index, generated in generate_many(count, seed, processes, **options):
+            result = {
+                "index": index,
+                "seed": generated.seed,
+                "difficulty": generated.difficulty,
+                "effort": generated.effort,
+                "clues": generated.clues,
+            }
+            for name, sudoku in (("puzzle", generated.puzzle), ("solution", generated.solution)):
+                result[name] = sudoku.to_string() if compact else [board.tolist() for board in sudoku.boards]
+            yield json.dumps(result) + "\n"
+
+    return Response(stream_puzzles(), mimetype="application/x-ndjson")
+
+
+@app.route('/jobs', methods=["POST"])
+@cross_origin()
+def create_job():
+    sudoku: Sudoku = read_sudoku()
+    invalid = invalid_sudoku_response(sudoku)
+    if invalid is not None:
+        return invalid
+
+    solver_factory = build_solver_factory(MAX_JOB_TIME_BUDGET)
+
+    job_id: str = job_manager.submit(solver_factory, sudoku)
+    return jsonify({"id": job_id, "status": "pending"}), 202, {"Location": "/jobs/{}".format(job_id)}
+
+
+@app.route('/jobs/<job_id>', methods=["GET"])
+@cross_origin()
+def get_job(job_id: str):
+    job_info = job_manager.get(job_id)
+    if job_info is None:
+        return jsonify({"error": "job nao encontrado: {}".format(job_id)}), 404
+    return jsonify(job_info)
+
+
+@app.route('/metrics', methods=["GET"])
+def metrics():
+    text: str = solver_metrics.render({
+        "sudoku_solution_cache_hits_total": solution_cache.hits,
+        "sudoku_solution_cache_misses_total": solution_cache.misses,
+        "sudoku_solution_cache_entries": len(solution_cache),
+    })
+    return Response(text, mimetype="text/plain; version=0.0.4")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""Implementa um solucionador exato para um Sudoku de ordem n, com tabuleiro de n^2 x n^2 celulas
+
+A estrategia utilizada e a busca com retrocesso (backtracking), representando os digitos ja utilizados em cada linha,
+coluna e submatriz como mascaras de bits e escolhendo a cada passo a celula vazia com menos candidatos (heuristica MRV).
+O solucionador segue o mesmo contrato de SimulatedAnnealingSudokuSolver, em que solve retorna o estado final e sua
+pontuacao.
+"""
+
+
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from state import State
+from stats import SolverStats
+from sudoku import Sudoku, SudokuLayout
+
+
+class BacktrackingSudokuSolver:
+    def __init__(self, initial_sudoku_problem: Sudoku, time_budget: float = None, max_iterations: int = None):
+        self.initial_sudoku_problem = initial_sudoku_problem.copy()
+        # quantidade de nos visitados na ultima busca, util para medir o esforco necessario para resolver o Sudoku
+        self.visited_nodes: int = 0
+        # contadores da ultima resolucao, em que as iteracoes sao os nos visitados
+        self.stats: SolverStats = SolverStats()
+        # limites padrao de solve, em segundos de relogio e em nos visitados. None indica ausencia de limite
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        # limites da busca em andamento, definidos apenas durante solve e, no caso do prazo, count_solutions
+        self.__deadline: float = float("inf")
+        self.__nodes_limit: float = float("inf")
+        self.__budget_exceeded: bool = False
+        layout: SudokuLayout = self.initial_sudoku_problem.layout
+        self.__size: int = layout.size
+        self.__all_digits_mask: int = layout.all_digits_mask
+        self.__cells_row: List[int] = layout.cells_row.tolist()
+        self.__cells_column: List[int] = layout.cells_column.tolist()
+        self.__cells_sub_board: List[int] = layout.cells_sub_board.tolist()
+
+    def solve(
+        self, progress_callback: Callable[[Dict], None] = None, time_budget: float = None, max_iterations: int = None
+    ) -> Tuple[State, float]:
+        """ Resolve o Sudoku de forma exata
+        :param progress_callback: funcao opcional chamada ao fim da busca com um dicionario contendo a quantidade de nos
+        visitados e a pontuacao obtida
+        :param time_budget: tempo maximo de busca, em segundos, por padrao o informado no construtor. O prazo e
+        verificado a cada 1024 nos visitados
+        :param max_iterations: quantidade maxima de nos visitados, por padrao a informada no construtor
+        :return state, score: uma tupla contendo o estado com o Sudoku resolvido e sua pontuacao, que vale 1. Caso o
+        Sudoku nao tenha solucao ou o limite seja atingido antes de encontra-la, e retornado o estado inicial e a sua
+        pontuacao
+        """
+
+        time_budget = time_budget if time_budget is not None else self.time_budget
+        max_iterations = max_iterations if max_iterations is not None else self.max_iterations
+        start_time: float = time.perf_counter()
+        self.__deadline = time.monotonic() + time_budget if time_budget is not None else float("inf")
+        nodes_limit: float = max_iterations if max_iterations is not None else float("inf")
+        self.__nodes_limit = nodes_limit
+        self.__budget_exceeded = False
+        try:
+            solutions: List[List[int]] = self.find_solutions(limit=1)
+        finally:
+            self.__deadline, self.__nodes_limit = float("inf"), float("inf")
+
+        if solutions:
+            state: State = State(Sudoku.from_cells(solutions[0]))
+        else:
+            state = State(self.initial_sudoku_problem.copy())
+
+        score: float = state.get_score()
+        self.stats = SolverStats()
+        self.stats.iterations = self.visited_nodes
+        self.stats.best_score = score
+        self.stats.solved = score == 1
+        if self.stats.solved:
+            self.stats.stop_reason = "solved"
+        elif self.__budget_exceeded:
+            self.stats.stop_reason = "max_iterations" if self.visited_nodes > nodes_limit else "time_budget"
+        else:
+            self.stats.stop_reason = "unsolvable"
+        self.stats.elapsed = time.perf_counter() - start_time
+        if progress_callback is not None:
+            progress_callback({"iteration": self.visited_nodes, "best_score": score})
+        return state, score
+
+    def count_solutions(self, limit: int = 2, time_budget: float = None) -> Optional[int]:
+        """ Conta as solucoes do Sudoku, interrompendo a busca ao atingir o limite informado
+        :param limit: quantidade maxima de solucoes procuradas, 2 e suficiente para verificar se a solucao e unica
+        :param time_budget: tempo maximo da contagem, em segundos. None permite contagens sem limite de tempo
+        :return solutions_count: quantidade de solucoes encontradas, no maximo igual ao limite, ou None caso o tempo se
+        esgote antes que a contagem seja concluida
+        """
+
+        self.__deadline = time.monotonic() + time_budget if time_budget is not None else float("inf")
+        self.__budget_exceeded = False
+        try:
+            solutions_count: int = len(self.find_solutions(limit))
+        finally:
+            self.__deadline = float("inf")
+        return None if self.__budget_exceeded else solutions_count
+
+    def find_solutions(self, limit: int = 1) -> List[List[int]]:
+        """ Busca ate limit solucoes do Sudoku
+        :param limit: quantidade maxima de solucoes procuradas
+        :return solutions: lista de solucoes, cada uma no formato de lista com as celulas do tabuleiro achatado
+        """
+
+        cells: List[int] = self.initial_sudoku_problem.cells.tolist()
+        rows_used: List[int] = [0] * self.__size
+        columns_used: List[int] = [0] * self.__size
+        sub_boards_used: List[int] = [0] * self.__size
+        empty_cells: List[int] = []
+        self.visited_nodes = 0
+
+        for cell, value in enumerate(cells):
+            if value == 0:
+                empty_cells.append(cell)
+                continue
+            bit: int = 1 << value
+            row, column, sub_board = (
+                self.__cells_row[cell], self.__cells_column[cell], self.__cells_sub_board[cell]
+            )
+            if (rows_used[row] | columns_used[column] | sub_boards_used[sub_board]) & bit:
+                return []  # as celulas fornecidas ja possuem repeticoes, logo nao ha solucao
+            rows_used[row] |= bit
+            columns_used[column] |= bit
+            sub_boards_used[sub_board] |= bit
+
+        solutions: List[List[int]] = []
+        self.__search(cells, empty_cells, rows_used, columns_used, sub_boards_used, solutions, limit)
+        return solutions
+
+    def __search(
+        self,
+        cells: List[int],
+        empty_cells: List[int],
+        rows_used: List[int],
+        columns_used: List[int],
+        sub_boards_used: List[int],
+        solutions: List[List[int]],
+        limit: int,
+    ) -> bool:
+        """ Rotina recursiva da busca com retrocesso. Escolhe a celula vazia com menos candidatos e testa cada um deles
+        :param cells: tabuleiro achatado sendo preenchido
+        :param empty_cells: celulas ainda vazias
+        :param rows_used: mascara dos digitos utilizados em cada linha
+        :param columns_used: mascara dos digitos utilizados em cada coluna
+        :param sub_boards_used: mascara dos digitos utilizados em cada submatriz
+        :param solutions: lista em que as solucoes encontradas sao acumuladas
+        :param limit: quantidade de solucoes a partir da qual a busca e interrompida
+        :return stop: True caso o limite de solucoes tenha sido atingido
+        """
+
+        self.visited_nodes += 1
+        if self.visited_nodes > self.__nodes_limit or (
+            self.visited_nodes & 1023 == 0 and time.monotonic() >= self.__deadline
+        ):
+            # o limite da busca foi atingido, a busca e interrompida como se o limite de solucoes tivesse sido atingido
+            self.__budget_exceeded = True
+            return True
+        if not empty_cells:
+            solutions.append(list(cells))
+            return len(solutions) >= limit
+
+        best_index: int = -1
+        best_candidates: int = 0
+        best_count: int = self.__size + 1
+        for index, cell in enumerate(empty_cells):
+            candidates: int = self.__all_digits_mask & ~(
+                rows_used[self.__cells_row[cell]]
+                | columns_used[self.__cells_column[cell]]
+                | sub_boards_used[self.__cells_sub_board[cell]]
+            )
+            count: int = bin(candidates).count("1")
+            if count < best_count:
+                best_index, best_candidates, best_count = index, candidates, count
+                if count <= 1:
+                    break
+
+        if best_count == 0:
+            return False
+
+        cell: int = empty_cells[best_index]
+        row, column, sub_board = self.__cells_row[cell], self.__cells_column[cell], self.__cells_sub_board[cell]
+        empty_cells[best_index] = empty_cells[-1]
+        empty_cells.pop()
+
+        stop: bool = False
+        candidates = best_candidates
+        while candidates and not stop:
+            bit: int = candidates & -candidates
+            candidates ^= bit
+            cells[cell] = bit.bit_length() - 1
+            rows_used[row] |= bit
+            columns_used[column] |= bit
+            sub_boards_used[sub_board] |= bit
+
+            stop = self.__search(cells, empty_cells, rows_used, columns_used, sub_boards_used, solutions, limit)
+
+            rows_used[row] ^= bit
+            columns_used[column] ^= bit
+            sub_boards_used[sub_board] ^= bit
+
+        cells[cell] = 0
+        empty_cells.append(cell)
+        empty_cells[best_index], empty_cells[-1] = empty_cells[-1], empty_cells[best_index]
+        return stop
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+"""Mede o desempenho dos solucionadores de Sudoku
+
+Cada solucionador e executado sobre os Sudokus de mocks.py e sobre um conjunto de Sudokus gerados por dificuldade, com
+uma semente fixa por execucao, de modo que duas rodadas do benchmark sejam comparaveis. Os Sudokus gerados vem de
+generator.py, com solucao unica e dificuldade classificada pelo esforco do solucionador exato. O resultado e impresso
+em JSON com a taxa de sucesso dentro do tempo limite, as iteracoes e reinicios ate a solucao e os percentis 50, 95 e 99
+do tempo de execucao.
+
+Exemplo:
+    python benchmark.py --engines annealing --runs 10 --budget 5 --no-presolve --output baseline.json
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+from numpy import array
+import numpy as np
+
+from engines import SOLVER_ENGINES
+from generator import DIFFICULTIES, GeneratedPuzzle, generate_puzzle
+from mocks import mock_list, mock_hard1
+from stochastic import StochasticSudokuSolver
+from sudoku import Sudoku
+
+
+def generate_corpus(size: int, difficulties: List[str], seed: int) -> List[Tuple[str, Sudoku]]:
+    """ Gera Sudokus de cada dificuldade com o gerador de generator.py, cada um com uma semente derivada da semente
+    informada
+    :param size: quantidade de Sudokus gerados por dificuldade
+    :param difficulties: dificuldades geradas, elementos de DIFFICULTIES
+    :param seed: semente da geracao, a mesma semente gera sempre o mesmo conjunto
+    :return corpus: lista de tuplas (dificuldade, Sudoku), com a dificuldade classificada pelo gerador, que pode
+    diferir da pedida caso nenhum Sudoku dela seja encontrado nas tentativas do gerador
+    """
+
+    puzzles_seeds: List[np.random.SeedSequence] = np.random.SeedSequence(seed).spawn(size * len(difficulties))
+    corpus: List[Tuple[str, Sudoku]] = []
+    for index, puzzle_seed in enumerate(puzzles_seeds):
+        generated: GeneratedPuzzle = generate_puzzle(
+            difficulty=difficulties[index // size], seed=int(puzzle_seed.generate_state(1)[0])
+        )
+        corpus.append((generated.difficulty, generated.puzzle))
+    return corpus
+
+
+def run_once(solver_factory: Callable, sudoku: Sudoku, seed: int, budget: float) -> Dict:
+    """ Resolve um Sudoku uma vez com uma semente fixa, limitando a resolucao ao tempo informado
+    :param solver_factory: funcao que cria o solucionador a partir de um Sudoku
+    :param sudoku: Sudoku a ser resolvido
+    :param seed: semente aleatoria da execucao
+    :param budget: tempo limite, em segundos
+    :return run: dicionario com o sucesso, o tempo, as iteracoes e os reinicios da execucao
+    """
+
+    start: float = time.perf_counter()
+    # as mensagens impressas pelos solucionadores nao podem se misturar ao JSON na saida padrao
+    with contextlib.redirect_stdout(io.StringIO()):
+        solver = solver_factory(sudoku, time_budget=budget)
+        if isinstance(solver, StochasticSudokuSolver):
+            solver.set_seed(seed)
+        _, score = solver.solve()
+    wall_time: float = time.perf_counter() - start
+
+    return {
+        "solved": score == 1 and wall_time <= budget,
+        "wall_time": wall_time,
+        "iterations": solver.stats.iterations,
+        "restarts": solver.stats.restarts,
+    }
+
+
+def summarize(runs: List[Dict]) -> Dict:
+    """ Agrega as execucoes de um grupo de Sudokus
+    :param runs: execucoes retornadas por run_once
+    :return summary: dicionario com a taxa de sucesso, as iteracoes e reinicios das execucoes bem sucedidas e os
+    percentis do tempo de todas as execucoes
+    """
+
+    solved_runs: List[Dict] = [run for run in runs if run["solved"]]
+    wall_times: array = np.array([run["wall_time"] for run in runs])
+    iterations: List[int] = [run["iterations"] for run in solved_runs]
+    restarts: List[int] = [run["restarts"] for run in solved_runs]
+
+    return {
+        "runs": len(runs),
+        "success_rate": round(len(solved_runs) / len(runs), 4),
+        "iterations_to_solve": {
+            "mean": round(float(np.mean(iterations)), 1) if iterations else None,
+            "p50": float(np.percentile(iterations, 50)) if iterations else None,
+        },
+        "restarts_to_solve": {
+            "mean": round(float(np.mean(restarts)), 2) if restarts else None,
+        },
+        "wall_time": {
+            "mean": round(float(np.mean(wall_times)), 6),
+            "p50": round(float(np.percentile(wall_times, 50)), 6),
+            "p95": round(float(np.percentile(wall_times, 95)), 6),
+            "p99": round(float(np.percentile(wall_times, 99)), 6),
+        },
+    }
+
+
+def run_benchmark(
+    engines: List[str], runs: int, budget: float, corpus_size: int, difficulties: List[str], seed: int,
+    presolve: bool = True, move_policy: str = "uniform",
+) -> Dict:
+    """ Executa o benchmark completo
+    :param engines: solucionadores medidos, chaves de SOLVER_ENGINES
+    :param runs: quantidade de execucoes de cada Sudoku, com as sementes seed, seed + 1, ..., seed + runs - 1
+    :param budget: tempo limite de cada execucao, em segundos
+    :param corpus_size: quantidade de Sudokus gerados por dificuldade
+    :param difficulties: dificuldades do conjunto gerado
+    :param seed: semente base das execucoes e da geracao do conjunto
+    :param presolve: repassado as temperas simulada e paralela, False mede apenas o laco principal dos algoritmos
+    :param move_policy: politica de perturbacao da tempera simulada
+    :return report: dicionario com a configuracao e os resultados por solucionador e grupo de Sudokus
+    """
+
+    groups: Dict[str, List[Sudoku]] = {
+        "mock/{}".format(name): [Sudoku(boards)] for name, boards in _mock_puzzles()
+    }
+    for difficulty, sudoku in generate_corpus(corpus_size, difficulties, seed):
+        groups.setdefault("generated/{}".format(difficulty), []).append(sudoku)
+
+    results: Dict[str, Dict] = dict()
+    for engine in engines:
+        options: Dict = dict()
+        if engine == "annealing":
+            options = {"presolve": presolve, "move_policy": move_policy}
+        elif engine == "tempering":
+            options = {"presolve": presolve}
+        solver_factory: Callable = functools.partial(SOLVER_ENGINES[engine], **options)
+
+        results[engine] = dict()
+        for group, sudokus in groups.items():
+            group_runs: List[Dict] = [
+                run_once(solver_factory, sudoku, seed + run, budget) for sudoku in sudokus for run in range(runs)
+            ]
+            results[engine][group] = summarize(group_runs)
+            print("{} {}: {}".format(engine, group, results[engine][group]["success_rate"]), file=sys.stderr)
+
+    return {
+        "config": {
+            "engines": engines,
+            "runs": runs,
+            "budget": budget,
+            "corpus_size": corpus_size,
+            "difficulties": difficulties,
+            "seed": seed,
+            "presolve": presolve,
+            "move_policy": move_policy,
+        },
+        "results": results,
+    }
+
+
+def _mock_puzzles() -> List[Tuple[str, List[array]]]:
+    """ Retorna os Sudokus de mocks.py, incluindo o Sudoku dificil que fica fora de mock_list
+    :param None
+    :return puzzles: lista de tuplas (nome, submatrizes)
+    """
+
+    return mock_list + [("hard 1", mock_hard1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos solucionadores de Sudoku, com resultado em JSON")
+    parser.add_argument("--engines", nargs="+", choices=list(SOLVER_ENGINES), default=list(SOLVER_ENGINES))
+    parser.add_argument("--runs", type=int, default=5, help="execucoes por Sudoku, cada uma com uma semente")
+    parser.add_argument("--budget", type=float, default=10.0, help="tempo limite por execucao, em segundos")
+    parser.add_argument("--corpus-size", type=int, default=10, help="Sudokus gerados por dificuldade")
+    parser.add_argument(
+        "--difficulties", nargs="+", choices=DIFFICULTIES, default=DIFFICULTIES
+    )
+    parser.add_argument("--seed", type=int, default=0, help="semente base das execucoes e do conjunto gerado")
+    parser.add_argument("--no-presolve", dest="presolve", action="store_false")
+    parser.add_argument("--move-policy", default="uniform")
+    parser.add_argument("--output", help="arquivo de saida, por padrao a saida padrao")
+    args = parser.parse_args()
+
+    report: Dict = run_benchmark(
+        args.engines, args.runs, args.budget, args.corpus_size, args.difficulties, args.seed, args.presolve,
+        args.move_policy,
+    )
+    output: str = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+"""Esquemas de resfriamento e politicas de reaquecimento para a tempera simulada
+
+Um esquema de resfriamento define como a temperatura evolui a cada iteracao, e uma politica de reaquecimento define o
+que acontece quando o algoritmo fica estagnado por muitas iteracoes. Ambos podem ser escolhidos pelo nome atraves de
+build_cooling_schedule e build_reheat_policy, permitindo que a API os receba como parametros da requisicao.
+"""
+
+import inspect
+from math import log, sqrt
+from typing import Dict
+
+
+class CoolingSchedule:
+    def __init__(self):
+        self.initial_temperature: float = 0
+        # iteracoes desde o ultimo (re)aquecimento
+        self.step: int = 0
+
+    def start(self, initial_temperature: float):
+        """ Reinicia o esquema a partir de uma temperatura inicial, chamado no inicio e a cada reaquecimento
+        :param initial_temperature: temperatura a partir da qual o resfriamento recomeca
+        :return None
+        """
+
+        self.initial_temperature = initial_temperature
+        self.step = 0
+
+    def next_temperature(self, temperature: float, accepted: bool) -> float:
+        """ Calcula a temperatura da proxima iteracao
+        :param temperature: temperatura atual
+        :param accepted: indica se o estado proposto na iteracao atual foi aceito
+        :return temperature: nova temperatura, 0 encerra o algoritmo
+        """
+
+        raise NotImplementedError
+
+
+class GeometricCooling(CoolingSchedule):
+    def __init__(self, alpha: float = 0.6):
+        super().__init__()
+        if not 0 < alpha < 1:
+            raise ValueError("alpha deve estar entre 0 e 1")
+        self.alpha: float = alpha
+
+    def next_temperature(self, temperature: float, accepted: bool) -> float:
+        return temperature * self.alpha
+
+
+class LinearCooling(CoolingSchedule):
+    def __init__(self, steps: int = 5000):
+        super().__init__()
+        if steps < 1:
+            raise ValueError("steps deve ser positivo")
+        # quantidade de iteracoes ate a temperatura chegar a 0
+        self.steps: int = steps
+
+    def next_temperature(self, temperature: float, accepted: bool) -> float:
+        return max(temperature - self.initial_temperature / self.steps, 0)
+
+
+class LogarithmicCooling(CoolingSchedule):
+    def __init__(self, c: float = 1.0, max_steps: int = 20000):
+        super().__init__()
+        if c <= 0:
+            raise ValueError("c deve ser positivo")
+        if max_steps < 1:
+            raise ValueError("max_steps deve ser positivo")
+        self.c: float = c
+        # o resfriamento logaritmico nunca chega a 0, entao o algoritmo e encerrado apos max_steps iteracoes
+        self.max_steps: int = max_steps
+
+    def next_temperature(self, temperature: float, accepted: bool) -> float:
+        self.step += 1
+        if self.step >= self.max_steps:
+            return 0
+        return self.initial_temperature / (1 + self.c * log(1 + self.step))
+
+
+class AdaptiveCooling(CoolingSchedule):
+    def __init__(self, target_acceptance: float = 0.3, window: int = 100, alpha: float = 0.9, max_steps: int = 20000):
+        super().__init__()
+        if not 0 <= target_acceptance <= 1:
+            raise ValueError("target_acceptance deve estar entre 0 e 1")
+        if window < 1:
+            raise ValueError("window deve ser positivo")
+        if not 0 < alpha < 1:
+            raise ValueError("alpha deve estar entre 0 e 1")
+        if max_steps < 1:
+            raise ValueError("max_steps deve ser positivo")
+        # taxa de aceitacao desejada, acima dela a temperatura cai com o fator alpha e abaixo dela com raiz de alpha
+        self.target_acceptance: float = target_acceptance
+        # quantidade de iteracoes utilizada para medir a taxa de aceitacao
+        self.window: int = window
+        self.alpha: float = alpha
+        self.max_steps: int = max_steps
+        self.__accepted_in_window: int = 0
+
+    def start(self, initial_temperature: float):
+        super().start(initial_temperature)
+        self.__accepted_in_window = 0
+
+    def next_temperature(self, temperature: float, accepted: bool) -> float:
+        self.step += 1
+        if self.step >= self.max_steps:
+            return 0
+
+        self.__accepted_in_window += accepted
+        if self.step % self.window != 0:
+            return temperature
+
+        acceptance: float = self.__accepted_in_window / self.window
+        self.__accepted_in_window = 0
+        if acceptance > self.target_acceptance:
+            return temperature * self.alpha
+        return temperature * sqrt(self.alpha)
+
+
+class ReheatPolicy:
+    # indica se o estado atual deve ser descartado e substituido por um novo estado inicial
+    restart_state: bool = False
+
+    def reheat_temperature(self, temperature: float, initial_temperature: float) -> float:
+        """ Calcula a temperatura utilizada apos uma estagnacao
+        :param temperature: temperatura no momento da estagnacao
+        :param initial_temperature: temperatura inicial do algoritmo
+        :return temperature: temperatura a partir da qual o resfriamento recomeca
+        """
+
+        raise NotImplementedError
+
+
+class RestartReheat(ReheatPolicy):
+    """ Recomeca do zero, gerando um novo estado inicial na temperatura inicial """
+
+    restart_state: bool = True
+
+    def reheat_temperature(self, temperature: float, initial_temperature: float) -> float:
+        return initial_temperature
+
+
+class TemperatureReheat(ReheatPolicy):
+    """ Mantem o estado atual e apenas eleva a temperatura a uma fracao da temperatura inicial """
+
+    def __init__(self, fraction: float = 0.5):
+        if fraction <= 0:
+            raise ValueError("fraction deve ser positivo")
+        self.fraction: float = fraction
+
+    def reheat_temperature(self, temperature: float, initial_temperature: float) -> float:
+        return initial_temperature * self.fraction
+
+
+COOLING_SCHEDULES: Dict[str, type] = {
+    "geometric": GeometricCooling,
+    "linear": LinearCooling,
+    "logarithmic": LogarithmicCooling,
+    "adaptive": AdaptiveCooling,
+}
+
+REHEAT_POLICIES: Dict[str, type] = {
+    "restart": RestartReheat,
+    "temperature": TemperatureReheat,
+}
+
+
+def build_cooling_schedule(name: str, params: Dict = None) -> CoolingSchedule:
+    """ Cria um esquema de resfriamento pelo nome
+    :param name: nome do esquema, uma das chaves de COOLING_SCHEDULES
+    :param params: parametros do construtor do esquema, parametros desconhecidos sao ignorados
+    :return schedule: esquema de resfriamento criado
+    """
+
+    return _build(COOLING_SCHEDULES, name, params)
+
+
+def build_reheat_policy(name: str, params: Dict = None) -> ReheatPolicy:
+    """ Cria uma politica de reaquecimento pelo nome
+    :param name: nome da politica, uma das chaves de REHEAT_POLICIES
+    :param params: parametros do construtor da politica, parametros desconhecidos sao ignorados
+    :return policy: politica de reaquecimento criada
+    """
+
+    return _build(REHEAT_POLICIES, name, params)
+
+
+def _build(registry: Dict[str, type], name: str, params: Dict = None):
+    """ Instancia uma classe de um registro pelo nome, convertendo os parametros para o tipo de seus valores padrao
+    :param registry: dicionario de nomes para classes
+    :param name: nome da classe buscada
+    :param params: parametros do construtor
+    :return instance: objeto criado
+    """
+
+    if name not in registry:
+        raise ValueError("opcao desconhecida: {}, utilize uma entre {}".format(name, ", ".join(registry)))
+
+    signature: inspect.Signature = inspect.signature(registry[name])
+    kwargs: Dict = {
+        param_name: type(parameter.default)(params[param_name])
+        for param_name, parameter in signature.parameters.items()
+        if params and param_name in params
+    }
+    return registry[name](**kwargs)
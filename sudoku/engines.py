@@ -0,0 +1,15 @@
+"""Solucionadores de Sudoku disponiveis pelo nome, compartilhados pela API e pelo benchmark
+"""
+
+from typing import Dict
+
+from backtracking import BacktrackingSudokuSolver
+from parallel_tempering import ParallelTemperingSudokuSolver
+from simulated_annealing import SimulatedAnnealingSudokuSolver
+
+# solucionadores disponiveis, por exemplo no parametro engine de /solve
+SOLVER_ENGINES: Dict[str, type] = {
+    "annealing": SimulatedAnnealingSudokuSolver,
+    "backtracking": BacktrackingSudokuSolver,
+    "tempering": ParallelTemperingSudokuSolver,
+}
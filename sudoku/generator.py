@@ -0,0 +1,206 @@
+"""Gerador de Sudokus com solucao unica
+
+Um tabuleiro completo e obtido preenchendo as submatrizes da diagonal, que nao compartilham linhas nem colunas, com
+permutacoes aleatorias dos digitos e completando o restante com o solucionador exato, seguido de uma transformacao
+aleatoria que preserva as regras do jogo. As celulas sao entao removidas em ordem aleatoria, e cada remocao so e mantida
+se a solucao continuar unica. A dificuldade e classificada pelo esforco de busca do solucionador exato, medido em nos
+visitados por celula vazia.
+"""
+
+import multiprocessing
+import os
+import secrets
+import time
+from typing import Dict, Iterator, List, Tuple
+from numpy import array
+import numpy as np
+
+from backtracking import BacktrackingSudokuSolver
+from solution_cache import get_transforms
+from sudoku import Sudoku, SudokuLayout, get_layout
+
+# niveis de dificuldade e o maior esforco, em nos visitados por celula vazia, de cada um. Um esforco proximo de 1
+# indica que a busca nunca precisou voltar atras
+DIFFICULTY_LEVELS: List[Tuple[str, float]] = [
+    ("easy", 1.5),
+    ("medium", 4.0),
+    ("hard", 15.0),
+    ("expert", float("inf")),
+]
+DIFFICULTIES: List[str] = [name for name, _ in DIFFICULTY_LEVELS]
+
+
+class GeneratedPuzzle:
+    def __init__(self, puzzle: Sudoku, solution: Sudoku, difficulty: str, effort: float, seed: int):
+        self.puzzle: Sudoku = puzzle
+        self.solution: Sudoku = solution
+        self.difficulty: str = difficulty
+        # nos visitados pelo solucionador exato por celula vazia
+        self.effort: float = effort
+        # semente que reproduz o Sudoku gerado com os mesmos parametros
+        self.seed: int = seed
+
+    @property
+    def clues(self) -> int:
+        return int(np.count_nonzero(self.puzzle.cells))
+
+
+def grade_difficulty(puzzle: Sudoku) -> Tuple[str, float]:
+    """ Classifica a dificuldade de um Sudoku pelo esforco de busca do solucionador exato
+    :param puzzle: Sudoku a ser classificado
+    :return difficulty, effort: nome do nivel de dificuldade e nos visitados por celula vazia
+    """
+
+    solver: BacktrackingSudokuSolver = BacktrackingSudokuSolver(puzzle)
+    solver.count_solutions(limit=1)
+    effort: float = solver.visited_nodes / max(int(np.count_nonzero(puzzle.cells == 0)), 1)
+    difficulty: str = next(name for name, max_effort in DIFFICULTY_LEVELS if effort <= max_effort)
+    return difficulty, effort
+
+
+def generate_full_grid(order: int, rng: np.random.Generator) -> Sudoku:
+    """ Gera um tabuleiro completo e valido aleatorio
+    :param order: ordem do Sudoku
+    :param rng: gerador de numeros aleatorios
+    :return solution: Sudoku sem celulas vazias
+    """
+
+    layout: SudokuLayout = get_layout(order)
+    found: List[List[int]] = []
+    # a partir da ordem 3 as submatrizes da diagonal sempre podem ser completadas, na ordem 2 algumas combinacoes
+    # nao tem solucao e sao sorteadas novamente
+    while not found:
+        sudoku: Sudoku = Sudoku(None, order)
+        for diagonal in range(order):
+            sudoku.cells[layout.sub_boards_cells[diagonal * (order + 1)]] = rng.permutation(layout.size) + 1
+        found = BacktrackingSudokuSolver(sudoku).find_solutions(limit=1)
+
+    cells: array = np.array(found[0], dtype=np.uint8)
+    transforms: array = get_transforms(order)
+    return Sudoku.from_cells(cells[transforms[rng.integers(len(transforms))]])
+
+
+def remove_clues(
+    solution: Sudoku,
+    rng: np.random.Generator,
+    min_clues: int = 0,
+    symmetric: bool = False,
+    check_time_budget: float = None,
+    deadline: float = None,
+) -> Sudoku:
+    """ Remove celulas de um tabuleiro completo, em ordem aleatoria, enquanto a solucao permanecer unica
+    :param solution: tabuleiro completo
+    :param rng: gerador de numeros aleatorios
+    :param min_clues: quantidade de celulas preenchidas a partir da qual as remocoes param
+    :param symmetric: remove as celulas aos pares, simetricos em relacao ao centro do tabuleiro
+    :param check_time_budget: tempo maximo, em segundos, de cada verificacao de unicidade. Quando ele se esgota a
+    unicidade e desconhecida e a celula e mantida. None permite verificacoes sem limite de tempo
+    :param deadline: instante, no relogio de time.monotonic, a partir do qual nenhuma nova remocao e tentada. None
+    permite remocoes sem limite de tempo
+    :return puzzle: Sudoku com solucao unica
+    """
+
+    cells: array = solution.cells.copy()
+    clues: int = len(cells)
+    deadline = deadline if deadline is not None else float("inf")
+    for cell in rng.permutation(len(cells)).tolist():
+        if clues <= min_clues or time.monotonic() >= deadline:
+            break
+        removed: List[int] = [cell, len(cells) - 1 - cell] if symmetric else [cell]
+        removed = [removed_cell for removed_cell in sorted(set(removed)) if cells[removed_cell] != 0]
+        if not removed:
+            continue
+
+        values: array = cells[removed]
+        cells[removed] = 0
+        solver: BacktrackingSudokuSolver = BacktrackingSudokuSolver(Sudoku.from_cells(cells))
+        if solver.count_solutions(limit=2, time_budget=check_time_budget) == 1:
+            clues -= len(removed)
+        else:
+            cells[removed] = values
+    return Sudoku.from_cells(cells)
+
+
+def generate_puzzle(
+    order: int = 3,
+    difficulty: str = None,
+    min_clues: int = 0,
+    symmetric: bool = False,
+    seed: int = None,
+    max_attempts: int = 100,
+    time_budget: float = None,
+    check_time_budget: float = None,
+) -> GeneratedPuzzle:
+    """ Gera um Sudoku com solucao unica
+    :param order: ordem do Sudoku
+    :param difficulty: nivel de dificuldade desejado, um entre DIFFICULTIES, ou None para qualquer nivel
+    :param min_clues: quantidade minima de celulas preenchidas
+    :param symmetric: gera Sudokus com celulas preenchidas simetricas em relacao ao centro do tabuleiro
+    :param seed: semente aleatoria, por padrao uma semente sorteada
+    :param max_attempts: quantidade maxima de Sudokus gerados ate encontrar um do nivel desejado. Caso nenhum seja
+    encontrado, o ultimo e retornado com o seu nivel real
+    :param time_budget: tempo maximo da geracao, em segundos. Ao esgota-lo as remocoes e as novas tentativas param e o
+    Sudoku atual e retornado, com solucao unica mas possivelmente com mais celulas preenchidas. None permite geracoes
+    sem limite de tempo, que a partir da ordem 4 podem levar muitos minutos
+    :param check_time_budget: tempo maximo de cada verificacao de unicidade, repassado a remove_clues
+    :return generated: objeto do tipo GeneratedPuzzle
+    """
+
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError(
+            "dificuldade desconhecida: {}, utilize uma entre {}".format(difficulty, ", ".join(DIFFICULTIES))
+        )
+
+    seed = seed if seed is not None else secrets.randbits(32)
+    rng: np.random.Generator = np.random.default_rng(seed)
+    deadline: float = time.monotonic() + time_budget if time_budget is not None else float("inf")
+    generated: GeneratedPuzzle = None
+    for _ in range(max_attempts):
+        if generated is not None and time.monotonic() >= deadline:
+            break
+        solution: Sudoku = generate_full_grid(order, rng)
+        puzzle: Sudoku = remove_clues(solution, rng, min_clues, symmetric, check_time_budget, deadline)
+        puzzle_difficulty, effort = grade_difficulty(puzzle)
+        generated = GeneratedPuzzle(puzzle, solution, puzzle_difficulty, effort, seed)
+        if difficulty is None or puzzle_difficulty == difficulty:
+            break
+    return generated
+
+
+def generate_many(
+    count: int, seed: int = None, processes: int = None, **options
+) -> Iterator[Tuple[int, GeneratedPuzzle]]:
+    """ Gera varios Sudokus distribuindo-os entre um conjunto de processos
+    :param count: quantidade de Sudokus gerados
+    :param seed: semente base, da qual sao derivadas as sementes de cada Sudoku, por padrao uma semente sorteada
+    :param processes: quantidade de processos utilizados, por padrao o menor valor entre Sudokus e nucleos
+    :param options: parametros repassados a generate_puzzle
+    :return generated: iterador de tuplas (indice, GeneratedPuzzle) na ordem em que as geracoes terminam. Caso o
+    iterador seja fechado antes do fim, as geracoes pendentes sao interrompidas
+    """
+
+    if count <= 0:
+        return
+
+    seed = seed if seed is not None else secrets.randbits(32)
+    seeds: List[int] = [
+        int(puzzle_seed.generate_state(1)[0]) for puzzle_seed in np.random.SeedSequence(seed).spawn(count)
+    ]
+    tasks: List[Tuple[int, Dict]] = [
+        (index, dict(options, seed=puzzle_seed)) for index, puzzle_seed in enumerate(seeds)
+    ]
+
+    processes = processes or min(count, os.cpu_count() or 1)
+    with multiprocessing.Pool(processes) as pool:
+        for result in pool.imap_unordered(_generate_item, tasks):
+            yield result
+
+
+def _generate_item(task: Tuple[int, Dict]) -> Tuple[int, GeneratedPuzzle]:
+    """ Gera um Sudoku dentro de um processo do conjunto criado por generate_many
+    :param task: tupla contendo o indice do Sudoku e os parametros de generate_puzzle
+    :return index, generated: indice do Sudoku e o Sudoku gerado
+    """
+
+    index, options = task
+    return index, generate_puzzle(**options)
@@ -0,0 +1,161 @@
+"""Execucao assincrona e em lote de resolucoes de Sudoku
+
+Cada resolucao submetida vira um job executado em um conjunto de processos proprio, dimensionado independentemente dos
+workers que atendem as requisicoes HTTP. O progresso de cada job (a melhor pontuacao obtida ate o momento) e
+compartilhado com o processo da API atraves de um dicionario gerenciado pelo multiprocessing. Lotes de Sudokus sao
+distribuidos entre processos e seus resultados sao entregues na ordem em que terminam.
+"""
+
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Tuple
+from numpy import array
+
+from sudoku import Sudoku
+
+
+class Job:
+    def __init__(self, job_id: str, future: Future):
+        self.job_id: str = job_id
+        self.future: Future = future
+
+    def get_status(self) -> str:
+        """ Retorna a situacao atual do job
+        :param None
+        :return status: "pending", "running", "done" ou "failed"
+        """
+
+        if not self.future.done():
+            return "running" if self.future.running() else "pending"
+        return "failed" if self.future.exception() is not None else "done"
+
+
+class JobManager:
+    def __init__(self, max_workers: int = None, max_jobs: int = 1000):
+        self.max_workers: int = max_workers or os.cpu_count() or 1
+        # quantidade maxima de jobs mantidos em memoria, os mais antigos ja finalizados sao descartados primeiro
+        self.max_jobs: int = max_jobs
+        self.__jobs: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+        # o conjunto de processos e o gerenciador sao criados apenas na primeira submissao
+        self.__executor: ProcessPoolExecutor = None
+        self.__manager = None
+        self.__progress: Dict[str, Dict] = None
+
+    def submit(self, solver_factory: Callable, sudoku: Sudoku) -> str:
+        """ Agenda a resolucao de um Sudoku e retorna imediatamente
+        :param solver_factory: funcao que cria o solucionador a partir de um Sudoku, o solucionador deve seguir o
+        contrato solve() -> (state, score)
+        :param sudoku: Sudoku a ser resolvido
+        :return job_id: identificador do job criado
+        """
+
+        job_id: str = uuid.uuid4().hex
+        with self.__lock:
+            if self.__executor is None:
+                self.__manager = multiprocessing.Manager()
+                self.__progress = self.__manager.dict()
+                self.__executor = ProcessPoolExecutor(self.max_workers)
+
+            future: Future = self.__executor.submit(
+                _run_job, job_id, solver_factory, sudoku.cells, self.__progress
+            )
+            self.__jobs[job_id] = Job(job_id, future)
+            self.__discard_old_jobs()
+        return job_id
+
+    def get(self, job_id: str) -> Dict:
+        """ Retorna a situacao de um job
+        :param job_id: identificador do job
+        :return job_info: dicionario com a situacao, a melhor pontuacao obtida ate o momento e, caso o job tenha
+        terminado, o tabuleiro final no formato de submatrizes e os contadores da resolucao, incluindo a semente
+        utilizada. None caso o job nao exista
+        """
+
+        job: Job = self.__jobs.get(job_id)
+        if job is None:
+            return None
+
+        status: str = job.get_status()
+        progress: Dict = self.__progress.get(job_id, {})
+        job_info: Dict = {"id": job_id, "status": status, "best_score": progress.get("best_score")}
+        if status == "done":
+            cells, score, stats = job.future.result()
+            job_info["score"] = score
+            job_info["solved"] = stats["solved"]
+            job_info["seed"] = stats["seed"]
+            job_info["stats"] = stats
+            job_info["best_score"] = max(score, job_info["best_score"] or 0)
+            job_info["boards"] = [board.tolist() for board in Sudoku.from_cells(cells).boards]
+        elif status == "failed":
+            job_info["error"] = str(job.future.exception())
+        return job_info
+
+    def __discard_old_jobs(self):
+        """ Descarta os jobs finalizados mais antigos enquanto o limite de jobs for ultrapassado
+        :param None
+        :return None
+        """
+
+        finished_jobs: List[str] = [job_id for job_id, job in self.__jobs.items() if job.future.done()]
+        for job_id in finished_jobs[:max(len(self.__jobs) - self.max_jobs, 0)]:
+            del self.__jobs[job_id]
+            self.__progress.pop(job_id, None)
+
+
+def _run_job(
+    job_id: str, solver_factory: Callable, cells: array, progress: Dict[str, Dict]
+) -> Tuple[array, float, Dict]:
+    """ Executa a resolucao de um job dentro de um processo do conjunto criado pelo JobManager
+    :param job_id: identificador do job
+    :param solver_factory: funcao que cria o solucionador a partir de um Sudoku
+    :param cells: tabuleiro achatado a ser resolvido
+    :param progress: dicionario compartilhado em que o progresso do job e publicado
+    :return cells, score, stats: tabuleiro final achatado, sua pontuacao e os contadores da resolucao
+    """
+
+    def publish(job_progress: Dict):
+        progress[job_id] = job_progress
+
+    solver = solver_factory(Sudoku.from_cells(cells))
+    state, score = solver.solve(progress_callback=publish)
+    return state.sudoku_problem.cells, score, solver.stats.to_dict()
+
+
+def solve_batch(
+    solver_factory: Callable, sudokus: List[Sudoku], processes: int = None
+) -> Iterator[Tuple[int, array, float]]:
+    """ Resolve um lote de Sudokus distribuindo-os entre um conjunto de processos
+    :param solver_factory: funcao que cria o solucionador a partir de um Sudoku, o solucionador deve seguir o
+    contrato solve() -> (state, score)
+    :param sudokus: Sudokus a serem resolvidos
+    :param processes: quantidade de processos utilizados, por padrao o menor valor entre Sudokus e nucleos
+    :return results: iterador de tuplas (indice do Sudoku no lote, tabuleiro final achatado, pontuacao) na ordem em que
+    as resolucoes terminam. Caso o iterador seja fechado antes do fim, as resolucoes pendentes sao interrompidas
+    """
+
+    if not sudokus:
+        return
+
+    processes = processes or min(len(sudokus), os.cpu_count() or 1)
+    tasks: List[Tuple[int, Callable, array]] = [
+        (index, solver_factory, sudoku.cells) for index, sudoku in enumerate(sudokus)
+    ]
+    with multiprocessing.Pool(processes) as pool:
+        for result in pool.imap_unordered(_solve_batch_item, tasks):
+            yield result
+
+
+def _solve_batch_item(task: Tuple[int, Callable, array]) -> Tuple[int, array, float]:
+    """ Resolve um Sudoku de um lote dentro de um processo do conjunto criado por solve_batch
+    :param task: tupla contendo o indice do Sudoku no lote, a funcao que cria o solucionador e o tabuleiro achatado
+    :return index, cells, score: indice do Sudoku no lote, tabuleiro final achatado e sua pontuacao
+    """
+
+    index, solver_factory, cells = task
+    state, score = solver_factory(Sudoku.from_cells(cells)).solve()
+    return index, state.sudoku_problem.cells, score
@@ -0,0 +1,105 @@
+"""Geracao das perturbacoes utilizadas pela tempera simulada
+
+As trocas validas de um Sudoku (pares de celulas livres de uma mesma submatriz) sao calculadas uma unica vez por
+problema em SwapTable, de modo que sortear uma perturbacao se resume a sortear um indice dessa tabela. MoveSampler
+sorteia esses indices, e os numeros utilizados no criterio de aceitacao, em blocos pre-gerados com o numpy. A politica
+de perturbacao define se as trocas sao sorteadas uniformemente ou direcionadas as celulas em conflito.
+"""
+
+from typing import List, Tuple
+from numpy import array
+import numpy as np
+
+
+class SwapTable:
+    def __init__(self, sub_boards_free_cells: List[List[int]]):
+        first_cells: List[int] = []
+        second_cells: List[int] = []
+        weights: List[float] = []
+
+        # submatrizes com menos de duas celulas livres nao admitem trocas e ficam de fora da tabela
+        swappable_sub_boards: List[List[int]] = [cells for cells in sub_boards_free_cells if len(cells) >= 2]
+        for free_cells in swappable_sub_boards:
+            pairs_count: int = len(free_cells) * (len(free_cells) - 1) // 2
+            for index, cell1 in enumerate(free_cells):
+                for cell2 in free_cells[index + 1:]:
+                    first_cells.append(cell1)
+                    second_cells.append(cell2)
+                    # cada submatriz tem a mesma chance de ser escolhida, e cada par a mesma chance dentro dela
+                    weights.append(1 / (len(swappable_sub_boards) * pairs_count))
+
+        self.first_cells: List[int] = first_cells
+        self.second_cells: List[int] = second_cells
+        self.weights: array = np.array(weights)
+        self.cumulative_weights: array = np.cumsum(self.weights)
+
+    def __len__(self):
+        return len(self.first_cells)
+
+
+MOVE_POLICIES: List[str] = ["uniform", "conflict"]
+
+
+class MoveSampler:
+    def __init__(
+        self,
+        swap_table: SwapTable,
+        rng: np.random.Generator = None,
+        buffer_size: int = 4096,
+        move_policy: str = "uniform",
+        conflict_attempts: int = 8,
+    ):
+        if move_policy not in MOVE_POLICIES:
+            raise ValueError("politica de perturbacao desconhecida: {}".format(move_policy))
+
+        self.swap_table: SwapTable = swap_table
+        self.buffer_size: int = buffer_size
+        # na politica "conflict" ate conflict_attempts trocas sao sorteadas ate que alguma envolva uma celula com
+        # digito repetido na sua linha ou coluna, caso contrario as trocas sao aceitas como sorteadas
+        self.move_policy: str = move_policy
+        self.conflict_attempts: int = conflict_attempts if move_policy == "conflict" else 0
+        self.rng: np.random.Generator = rng if rng is not None else np.random.default_rng()
+        self.__swaps: List[int] = []
+        self.__swaps_index: int = 0
+        self.__uniforms: List[float] = []
+        self.__uniforms_index: int = 0
+
+    def seed(self, seed: int):
+        """ Substitui o gerador de numeros aleatorios e descarta os sorteios ja gerados
+        :param seed: semente do novo gerador
+        :return None
+        """
+
+        self.rng = np.random.default_rng(seed)
+        self.__swaps, self.__swaps_index = [], 0
+        self.__uniforms, self.__uniforms_index = [], 0
+
+    def next_swap(self) -> Tuple[int, int]:
+        """ Sorteia uma troca da tabela respeitando os pesos de cada par
+        :param None
+        :return cell1, cell2: indices, no tabuleiro achatado, das celulas a serem trocadas
+        """
+
+        if self.__swaps_index >= len(self.__swaps):
+            draws: array = self.rng.random(self.buffer_size) * self.swap_table.cumulative_weights[-1]
+            swaps: array = np.searchsorted(self.swap_table.cumulative_weights, draws, side="right")
+            self.__swaps = np.minimum(swaps, len(self.swap_table) - 1).tolist()
+            self.__swaps_index = 0
+
+        swap: int = self.__swaps[self.__swaps_index]
+        self.__swaps_index += 1
+        return self.swap_table.first_cells[swap], self.swap_table.second_cells[swap]
+
+    def next_uniform(self) -> float:
+        """ Sorteia um numero real uniformemente distribuido entre 0 e 1
+        :param None
+        :return value: numero sorteado
+        """
+
+        if self.__uniforms_index >= len(self.__uniforms):
+            self.__uniforms = self.rng.random(self.buffer_size).tolist()
+            self.__uniforms_index = 0
+
+        value: float = self.__uniforms[self.__uniforms_index]
+        self.__uniforms_index += 1
+        return value
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+"""Implementa um solucionador para um Sudoku de ordem n com tempera paralela (troca de replicas)
+
+R replicas do Sudoku evoluem ao mesmo tempo, cada uma a uma temperatura fixa de uma escada geometrica. Todas as replicas
+ficam empilhadas em uma unica matriz de formato (R, n^4), de modo que a cada passo uma troca e sorteada, aplicada e
+pontuada para todas as replicas de uma so vez com operacoes vetorizadas do numpy. Periodicamente, replicas em degraus
+vizinhos da escada trocam de temperatura segundo o criterio de Metropolis, o que permite que um estado preso em um otimo
+local a baixa temperatura seja substituido por um estado vindo de temperaturas mais altas, sem os reinicios da tempera
+simulada.
+"""
+
+
+import time
+from typing import Callable, Dict, Tuple
+from numpy import array
+import numpy as np
+from state import State
+from stochastic import StochasticSudokuSolver
+from sudoku import Sudoku, SudokuLayout
+
+# limite de iteracoes de solve quando nem o tempo nem as iteracoes sao limitados
+DEFAULT_MAX_ITERATIONS: int = 5000000
+
+
+class ParallelTemperingSudokuSolver(StochasticSudokuSolver):
+    def __init__(
+        self,
+        initial_sudoku_problem: Sudoku,
+        replicas: int = 32,
+        min_temperature: float = None,
+        max_temperature: float = None,
+        exchange_interval: int = 10,
+        presolve: bool = True,
+        collect_timings: bool = False,
+        seed: int = None,
+        time_budget: float = None,
+        max_iterations: int = None,
+    ):
+        if replicas < 1:
+            raise ValueError("a quantidade de replicas deve ser positiva")
+        if exchange_interval < 1:
+            raise ValueError("exchange_interval deve ser positivo")
+
+        super().__init__(initial_sudoku_problem, presolve, collect_timings, seed, time_budget, max_iterations)
+        layout: SudokuLayout = self.initial_sudoku_problem.layout
+        self.__first_cells: array = np.array(self.swap_table.first_cells, dtype=np.intp)
+        self.__second_cells: array = np.array(self.swap_table.second_cells, dtype=np.intp)
+        # linhas seguidas das colunas do tabuleiro, e para cada celula o indice da sua linha e da sua coluna nessa lista
+        self.__lines_cells: array = np.array(layout.units_cells[:2 * layout.size])
+        self.__cells_lines: array = np.stack([layout.cells_row, layout.size + layout.cells_column], axis=1)
+
+        self.replicas: int = replicas
+        # a pontuacao varia em multiplos de 1 / (2n^4), a menor variacao causada por uma troca. Por padrao a escada vai
+        # de uma temperatura em que perder esse minimo e aceito em cerca de 2% das vezes ate uma em que e aceito em
+        # cerca de 70% das vezes
+        score_unit: float = 1 / (2 * layout.size * layout.size)
+        self.min_temperature: float = min_temperature if min_temperature is not None else score_unit / 4
+        self.max_temperature: float = max_temperature if max_temperature is not None else score_unit * 3
+        if not 0 < self.min_temperature <= self.max_temperature:
+            raise ValueError("as temperaturas devem ser positivas e min_temperature nao pode exceder max_temperature")
+        self.temperatures: array = np.geomspace(self.min_temperature, self.max_temperature, replicas)
+        # passos, em que cada replica recebe uma proposta de troca, entre duas tentativas de troca de temperaturas
+        self.exchange_interval: int = exchange_interval
+        # gerador de numeros aleatorios unico para todas as replicas, reiniciado por set_seed
+        self.rng: np.random.Generator = np.random.default_rng(self.seed)
+
+    def set_seed(self, seed: int):
+        """ Substitui a semente do solucionador, reiniciando o seu gerador de numeros aleatorios
+        :param seed: nova semente
+        :return None
+        """
+
+        super().set_seed(seed)
+        self.rng = np.random.default_rng(seed)
+
+    def __generate_replicas(self) -> array:
+        """ Gera os estados iniciais das replicas, preenchendo as celulas vazias de cada submatriz com uma permutacao
+        aleatoria dos digitos ausentes nela, independente para cada replica
+        :param None
+        :return replicas_cells: matriz de formato (R, n^4) com um tabuleiro achatado por replica
+        """
+
+        start: float = time.perf_counter()
+        cells: array = self.initial_sudoku_problem.cells
+        replicas_cells: array = np.tile(cells, (self.replicas, 1))
+        for free_cells, missing_digits in zip(self.sub_boards_free_cells, self.sub_boards_missing_digits):
+            if not free_cells:
+                continue
+            # uma permutacao independente por replica, obtida ordenando numeros aleatorios
+            permutations: array = np.argsort(self.rng.random((self.replicas, len(free_cells))), axis=1)
+            replicas_cells[:, free_cells] = np.array(missing_digits)[permutations]
+        self.stats.copy_time += time.perf_counter() - start
+        return replicas_cells
+
+    def __lines_unique(self, replicas_cells: array, replicas_lines: array) -> array:
+        """ Conta os digitos sem repeticao de algumas linhas e colunas de cada replica
+        :param replicas_cells: matriz de formato (R, n^4) com os tabuleiros das replicas
+        :param replicas_lines: matriz de formato (R, L) com os indices das L linhas ou colunas contadas em cada replica,
+        na numeracao de units_cells
+        :return lines_unique: matriz de formato (R, L) com a quantidade de digitos que aparecem uma unica vez em cada
+        linha ou coluna contada
+        """
+
+        lines_values: array = replicas_cells[
+            np.arange(len(replicas_cells))[:, None, None], self.__lines_cells[replicas_lines]
+        ]
+        lines_digits_count: array = (lines_values[..., None] == self.initial_sudoku_problem.layout.digits).sum(axis=2)
+        return np.count_nonzero(lines_digits_count == 1, axis=2)
+
+    def solve(
+        self,
+        progress_callback: Callable[[Dict], None] = None,
+        progress_interval: float = 0.5,
+        time_budget: float = None,
+        max_iterations: int = None,
+    ) -> Tuple[State, float]:
+        """ Rotina principal da tempera paralela. A cada passo uma troca entre duas celulas livres de uma mesma
+        submatriz e sorteada para cada replica, e a pontuacao resultante e calculada recontando apenas as linhas e
+        colunas afetadas. Cada replica aceita a sua troca se a pontuacao nao piorar ou, caso contrario, com a
+        probabilidade de e^(delta/T), em que T e a temperatura da replica. A cada exchange_interval passos, pares de
+        degraus vizinhos da escada, alternadamente os pares pares e os impares, trocam as suas replicas com a
+        probabilidade de e^((s_j - s_i)(1/T_i - 1/T_j)), em que s_i e a pontuacao da replica no degrau de temperatura
+        T_i. O algoritmo para ao resolver o Sudoku ou ao esgotar o tempo ou as iteracoes disponiveis, e o motivo da
+        parada fica registrado em stats.stop_reason.
+        :param progress_callback: funcao opcional chamada no inicio, no fim e periodicamente durante a execucao com um
+        dicionario contendo a iteracao, a menor temperatura, a pontuacao da replica mais fria, a melhor pontuacao e a
+        quantidade de trocas de temperatura aceitas
+        :param progress_interval: intervalo minimo, em segundos, entre duas chamadas periodicas de progress_callback. O
+        relogio so e consultado a cada 64 passos
+        :param time_budget: tempo maximo de execucao, em segundos, por padrao o informado no construtor. Assim como o
+        intervalo de progresso, o prazo so e verificado a cada 64 passos
+        :param max_iterations: quantidade maxima de iteracoes, somando as propostas de todas as replicas, por padrao a
+        informada no construtor. O limite e verificado antes de cada passo, que soma R iteracoes
+        :return best_state, best_score: uma tupla contendo o estado de maior pontuacao visto em qualquer replica e a sua
+        pontuacao, idealmente igual a 1. Os contadores da execucao ficam disponiveis no atributo stats
+        """
+
+        # como as temperaturas sao fixas a busca nao termina sozinha, entao sem limites vale DEFAULT_MAX_ITERATIONS
+        stats, deadline, iterations_limit = self._start_solve(time_budget, max_iterations, DEFAULT_MAX_ITERATIONS)
+        start_time: float = time.perf_counter()
+
+        size: int = self.initial_sudoku_problem.size
+        # as pontuacoes sao mantidas como totais inteiros de digitos sem repeticao, divididos por max_unique apenas
+        # quando necessario, evitando que somas sucessivas de variacoes em ponto flutuante se desviem de 1
+        max_unique: int = 2 * size * size
+        replicas_index: array = np.arange(self.replicas)
+        replicas_cells: array = self.__generate_replicas()
+        all_lines: array = np.tile(np.arange(2 * size), (self.replicas, 1))
+        lines_unique: array = self.__lines_unique(replicas_cells, all_lines)
+        unique_totals: array = lines_unique.sum(axis=1)
+        # rung_replicas[k] e a replica que ocupa o degrau k da escada, na temperatura temperatures[k]
+        rung_replicas: array = replicas_index.copy()
+        replicas_temperatures: array = self.temperatures.copy()
+
+        best_replica: int = int(np.argmax(unique_totals))
+        best_score: float = float(unique_totals[best_replica] / max_unique)
+        best_cells: array = replicas_cells[best_replica].copy()
+        has_moves: bool = self.has_moves()
+        iteration: int = 0
+        step: int = 0
+        next_report_time: float = time.monotonic() + progress_interval
+
+        def update_stats():
+            stats.iterations = iteration
+            stats.best_score = best_score
+            stats.solved = best_score == 1
+            stats.elapsed = time.perf_counter() - start_time
+
+        def report_progress():
+            update_stats()
+            progress_callback({
+                "iteration": iteration,
+                "temperature": float(self.temperatures[0]),
+                "score": float(unique_totals[rung_replicas[0]] / max_unique),
+                "best_score": best_score,
+                "accepted_exchanges": stats.accepted_exchanges,
+            })
+
+        if progress_callback is not None:
+            report_progress()
+
+        if not has_moves:
+            stats.stop_reason = "solved" if best_score == 1 else "no_moves"
+            update_stats()
+            return State(Sudoku.from_cells(best_cells)), best_score
+
+        cumulative_weights: array = self.swap_table.cumulative_weights
+        while best_score != 1 and iteration < iterations_limit:
+            step += 1
+            iteration += self.replicas
+            disturb_start: float = time.perf_counter() if stats.collect_timings else 0
+
+            swaps: array = np.searchsorted(
+                cumulative_weights, self.rng.random(self.replicas) * cumulative_weights[-1], side="right"
+            )
+            swaps = np.minimum(swaps, len(self.swap_table) - 1)
+            cells1: array = self.__first_cells[swaps]
+            cells2: array = self.__second_cells[swaps]
+            values1: array = replicas_cells[replicas_index, cells1]
+            values2: array = replicas_cells[replicas_index, cells2]
+            replicas_cells[replicas_index, cells1] = values2
+            replicas_cells[replicas_index, cells2] = values1
+
+            scoring_start: float = time.perf_counter() if stats.collect_timings else 0
+            # as trocas acontecem dentro de uma submatriz, entao apenas as linhas e colunas das duas celulas mudam.
+            # Quando as celulas estao na mesma linha ou coluna o seu conteudo nao muda e a diferenca e nula
+            touched_lines: array = np.concatenate([self.__cells_lines[cells1], self.__cells_lines[cells2]], axis=1)
+            new_lines_unique: array = self.__lines_unique(replicas_cells, touched_lines)
+            delta_unique: array = (new_lines_unique - lines_unique[replicas_index[:, None], touched_lines]).sum(axis=1)
+            delta_scores: array = delta_unique / max_unique
+            if stats.collect_timings:
+                stats.disturb_time += scoring_start - disturb_start
+                stats.scoring_time += time.perf_counter() - scoring_start
+
+            accepted: array = (delta_scores >= 0) | (
+                self.rng.random(self.replicas) < np.exp(np.minimum(delta_scores, 0) / replicas_temperatures)
+            )
+            rejected: array = ~accepted
+            replicas_cells[rejected, cells1[rejected]] = values1[rejected]
+            replicas_cells[rejected, cells2[rejected]] = values2[rejected]
+            accepted_replicas: array = np.flatnonzero(accepted)
+            lines_unique[accepted_replicas[:, None], touched_lines[accepted_replicas]] = (
+                new_lines_unique[accepted_replicas]
+            )
+            unique_totals[accepted_replicas] += delta_unique[accepted_replicas]
+
+            accepted_uphill: int = int(np.count_nonzero(accepted & (delta_scores < 0)))
+            stats.accepted_uphill += accepted_uphill
+            stats.accepted_downhill += int(np.count_nonzero(accepted)) - accepted_uphill
+            stats.rejected += int(np.count_nonzero(rejected))
+
+            step_best: int = int(np.argmax(unique_totals))
+            if unique_totals[step_best] / max_unique > best_score:
+                best_score = float(unique_totals[step_best] / max_unique)
+                best_cells[:] = replicas_cells[step_best]
+
+            if step % self.exchange_interval == 0 and self.replicas > 1:
+                # degraus (k, k + 1), alternando entre os pares que comecam nos degraus pares e nos impares
+                lower_rungs: array = np.arange((step // self.exchange_interval) % 2, self.replicas - 1, 2)
+                lower_replicas: array = rung_replicas[lower_rungs]
+                upper_replicas: array = rung_replicas[lower_rungs + 1]
+                log_acceptance: array = (unique_totals[upper_replicas] - unique_totals[lower_replicas]) / max_unique * (
+                    1 / self.temperatures[lower_rungs] - 1 / self.temperatures[lower_rungs + 1]
+                )
+                exchanged: array = np.log(self.rng.random(len(lower_rungs))) < log_acceptance
+                rung_replicas[lower_rungs[exchanged]] = upper_replicas[exchanged]
+                rung_replicas[lower_rungs[exchanged] + 1] = lower_replicas[exchanged]
+                replicas_temperatures[rung_replicas] = self.temperatures
+                stats.exchanges += len(lower_rungs)
+                stats.accepted_exchanges += int(np.count_nonzero(exchanged))
+
+            if step & 63 == 0:
+                now: float = time.monotonic()
+                if now >= deadline:
+                    break
+                if progress_callback is not None and now >= next_report_time:
+                    report_progress()
+                    next_report_time = now + progress_interval
+
+        if best_score == 1:
+            stats.stop_reason = "solved"
+        elif iteration >= iterations_limit:
+            stats.stop_reason = "max_iterations"
+        else:
+            stats.stop_reason = "time_budget"
+        update_stats()
+        if progress_callback is not None:
+            report_progress()
+
+        return State(Sudoku.from_cells(best_cells)), best_score
@@ -1,127 +1,353 @@
 #!/usr/bin/env python
-"""Implementa um solucionador para um Sudoku tradicional
+"""Implementa um solucionador para um Sudoku de ordem n
 
-Este código implementa classes e modelos para solucionar instâncias de um problema Sudoku tradicional com 9 linhas
-e 9 coulnas. A estrategia utilizada para resolucao e a tempera simulada.
+Este código implementa classes e modelos para solucionar instâncias de um problema Sudoku com n^2 linhas e n^2
+colunas, sendo o Sudoku tradicional o caso n = 3. A estrategia utilizada para resolucao e a tempera simulada.
 """
 
 
-import copy
+import multiprocessing
+import os
 import random
-from math import exp
-from typing import Dict, List, Tuple
+import time
+from math import exp, sqrt
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+from cooling import CoolingSchedule, GeometricCooling, ReheatPolicy, RestartReheat
+from moves import MoveSampler
 from state import State
+from stats import SolverStats
+from stochastic import StochasticSudokuSolver
 from sudoku import Sudoku
 
 
-class SimulatedAnnealingSudokuSolver:
+class SimulatedAnnealingSudokuSolver(StochasticSudokuSolver):
     def __init__(
-        self, initial_sudoku_problem: Sudoku, stale_limit: int = 500
+        self,
+        initial_sudoku_problem: Sudoku,
+        stale_limit: int = 500,
+        presolve: bool = True,
+        initial_temperature: float = None,
+        cooling_schedule: CoolingSchedule = None,
+        reheat_policy: ReheatPolicy = None,
+        calibration_acceptance: float = 0.8,
+        calibration_samples: int = 300,
+        greedy_first_state: bool = False,
+        move_policy: str = "uniform",
+        collect_timings: bool = False,
+        seed: int = None,
+        time_budget: float = None,
+        max_iterations: int = None,
     ):
-        self.initial_sudoku_problem = initial_sudoku_problem
-        self.fixed_positions_dict = self.__find_fixed_positions()
+        super().__init__(initial_sudoku_problem, presolve, collect_timings, seed, time_budget, max_iterations)
+        # geradores de numeros aleatorios proprios do solucionador, reiniciados por set_seed
+        self.random: random.Random = random.Random(self.seed)
+        self.move_sampler: MoveSampler = MoveSampler(
+            self.swap_table, rng=np.random.default_rng(self.seed), move_policy=move_policy
+        )
         self.stale_limit = stale_limit
-
-    def __find_fixed_positions(self) -> Dict[int, List[int]]:
-        """ Encontra as celulas fornecidas inicialmente no Sudoku e as armazena em um dicionario em que a chave
-        representa a submatriz no tabuleiro e o valor uma lista de numeros entre 0 e 8 indicando a ordem da celula
-        :param None
-        :return fixed_positions_dict: Dicionario contendo as celulas que nao podem ser alteradas durante a execucao
-        do algoritmo
-        """
-
-        fixed_positions_dict: Dict[int, List[int]] = dict()
-        for board_index in range(9):
-            board_fixed_positions: List[int] = []
-            for row in range(3):
-                for column in range(3):
-                    board = self.initial_sudoku_problem.boards[board_index]
-                    if board[row, column] != 0:
-                        board_fixed_positions.append(3 * row + column)
-            fixed_positions_dict[board_index] = board_fixed_positions
-        return fixed_positions_dict
+        # quando a temperatura inicial nao e informada ela e calibrada a partir de perturbacoes do primeiro estado,
+        # de modo que a fracao esperada de estados aceitos no inicio seja calibration_acceptance
+        self.initial_temperature = initial_temperature
+        self.calibration_acceptance = calibration_acceptance
+        self.calibration_samples = calibration_samples
+        # por padrao a temperatura cai 40% a cada iteracao e uma estagnacao reinicia o algoritmo do zero
+        self.cooling_schedule: CoolingSchedule = cooling_schedule or GeometricCooling(0.6)
+        self.reheat_policy: ReheatPolicy = reheat_policy or RestartReheat()
+        # quando verdadeiro, o estado inicial escolhe para cada celula o digito que menos se repete na sua linha e
+        # coluna
+        self.greedy_first_state = greedy_first_state
 
     def __generate_first_state(self) -> State:
         """ Gera o estado inicial de entrada do algoritmo a partir da instancial original do problema, preenchendo-se
-        as celulas vazias
+        as celulas vazias de cada submatriz com uma permutacao aleatoria dos digitos ausentes nela, o que respeita a
+        regra de valores unicos em cada submatriz
         :param None
-        :return first_state: objeto do tipo State contendo o Sudoku inicial com as celulas vazias preenchidas de valores
-        escolhidos aleatoriamentes no intervalo de 1 a 9
+        :return first_state: objeto do tipo State contendo o Sudoku inicial com as celulas vazias preenchidas
         """
 
-        values: List[int] = [v for v in range(1, 10)]
-        filling_sudoku: Sudoku = copy.deepcopy(self.initial_sudoku_problem)
-        for row in range(9):
-            for column in range(9):
-                sub_board: int = 3 * (row // 3) + (column // 3)
-                cell_value: int = self.initial_sudoku_problem.boards[sub_board][
-                    row % 3, column % 3
-                ]
-                if cell_value == 0:  # celula vazia
-                    # preenchendo a celula vazia com um valor ainda nao usado na sua submatriz para respeitar a regra
-                    # de valores unicos em cada submatriz
-                    new_value: int = random.choice(
-                        [
-                            x
-                            for x in values
-                            if x
-                            not in [
-                                value
-                                for row in filling_sudoku.boards[sub_board]
-                                for value in row
-                            ]
-                        ]
-                    )
-                    filling_sudoku.boards[sub_board][row % 3, column % 3] = new_value
+        start: float = time.perf_counter()
+        filling_sudoku: Sudoku = self.initial_sudoku_problem.copy()
+        filling_cells = filling_sudoku.cells
+
+        if self.greedy_first_state:
+            self.__fill_greedily(filling_cells)
+        else:
+            for free_cells, missing_digits in zip(self.sub_boards_free_cells, self.sub_boards_missing_digits):
+                digits: List[int] = list(missing_digits)
+                self.random.shuffle(digits)
+                filling_cells[free_cells] = digits
 
         first_state: State = State(filling_sudoku)
+        self.stats.copy_time += time.perf_counter() - start
         return first_state
 
-    def solve(self) -> Tuple[State, float]:
+    def __fill_greedily(self, filling_cells):
+        """ Preenche as celulas vazias escolhendo, para cada uma, entre os digitos ainda ausentes da sua submatriz, o
+        que aparece menos vezes na sua linha e na sua coluna. As celulas sao visitadas em ordem aleatoria e os empates
+        sao resolvidos aleatoriamente
+        :param filling_cells: tabuleiro achatado a ser preenchido
+        :return None, o tabuleiro e alterado diretamente dentro do metodo
+        """
+
+        size: int = self.initial_sudoku_problem.size
+        rows_digits_count: List[List[int]] = [[0] * (size + 1) for _ in range(size)]
+        columns_digits_count: List[List[int]] = [[0] * (size + 1) for _ in range(size)]
+        for cell, value in enumerate(filling_cells.tolist()):
+            rows_digits_count[cell // size][value] += 1
+            columns_digits_count[cell % size][value] += 1
+
+        for free_cells, missing_digits in zip(self.sub_boards_free_cells, self.sub_boards_missing_digits):
+            cells_order: List[int] = self.random.sample(free_cells, len(free_cells))
+            digits: List[int] = self.random.sample(missing_digits, len(missing_digits))
+            for cell in cells_order:
+                row_count: List[int] = rows_digits_count[cell // size]
+                column_count: List[int] = columns_digits_count[cell % size]
+                digit: int = min(digits, key=lambda candidate: row_count[candidate] + column_count[candidate])
+                digits.remove(digit)
+                filling_cells[cell] = digit
+                row_count[digit] += 1
+                column_count[digit] += 1
+
+    def set_seed(self, seed: int):
+        """ Substitui a semente do solucionador, reiniciando os seus geradores de numeros aleatorios
+        :param seed: nova semente
+        :return None
+        """
+
+        super().set_seed(seed)
+        self.random.seed(seed)
+        self.move_sampler.seed(seed)
+
+    def __calibrate_temperature(self, state: State, score: float) -> float:
+        """ Estima a temperatura inicial a partir de perturbacoes aleatorias do estado recebido, que sao desfeitas em
+        seguida. A temperatura e escolhida por bissecao de modo que a taxa de aceitacao media das perturbacoes
+        amostradas, e^(delta/T) para as que pioram o estado e 1 para as demais, seja igual a calibration_acceptance
+        :param state: estado a partir do qual as perturbacoes sao amostradas
+        :param score: pontuacao do estado
+        :return temperature: temperatura inicial calibrada
+        """
+
+        worsening_deltas: List[float] = []
+        for _ in range(self.calibration_samples):
+            delta_score: float = state.propose_move(self.move_sampler) - score
+            state.reject_move()
+            if delta_score < 0:
+                worsening_deltas.append(delta_score)
+
+        improving_count: int = self.calibration_samples - len(worsening_deltas)
+        if not worsening_deltas or improving_count >= self.calibration_acceptance * self.calibration_samples:
+            # a taxa desejada ja e atingida com qualquer temperatura, entao basta uma temperatura da ordem das
+            # variacoes de pontuacao observadas
+            return -min(worsening_deltas, default=-1.0)
+
+        low, high = 1e-9, 1e3
+        for _ in range(60):
+            temperature: float = sqrt(low * high)
+            acceptance: float = (
+                improving_count + sum(exp(delta / temperature) for delta in worsening_deltas)
+            ) / self.calibration_samples
+            if acceptance < self.calibration_acceptance:
+                low = temperature
+            else:
+                high = temperature
+        return high
+
+    def solve(
+        self,
+        progress_callback: Callable[[Dict], None] = None,
+        progress_interval: float = 0.5,
+        time_budget: float = None,
+        max_iterations: int = None,
+    ) -> Tuple[State, float]:
         """ Rotina principal do algoritmo de tempera simulada. A cada iteracao um novo estado e gerado a partir
         do estado atual com a rotina de perturbacao do estado, a qualidade do novo estado e calculada e se essa for
         maior do qua a qualidade do estado atual, aceitamos o novo estado como atual e atualizamos a energia do sistema,
         caso a qualidade nao seja maior, ainda podemos aceita-lo com a probabilidade de e^(delta/T), em que delta e a
         variacao da qualidade do estado atual e o possivel novo estado e T representa a temperatura atual do sistema.
-        A cada iteracao a temperatura e decrescida de um fator ate chegar a 0, momento em que o algoritmo
-        obrigatoriamente para e retorna a melhor solucao encontrada ate o momento.
-        :param None
-        :return current_state, current_score: uma tupla contendo o ultimo estado obtido apos a temperatura do sistema
-        chegar a 0 e a pontuacao desse estado, idealmente, essa pontuacao deve valer 1, consequentemente, o estado
-        retornado deve conter o Sudoku resolvido
+        A cada iteracao a temperatura e decrescida segundo o esquema de resfriamento ate chegar a 0, momento em que o
+        algoritmo obrigatoriamente para e retorna a melhor solucao encontrada ate o momento. Quando o algoritmo fica
+        estagnado por mais de stale_limit iteracoes, a politica de reaquecimento define a nova temperatura e se o
+        estado atual deve ser substituido por um novo estado inicial. O algoritmo tambem para ao esgotar o tempo ou as
+        iteracoes disponiveis, e o motivo da parada fica registrado em stats.stop_reason.
+        :param progress_callback: funcao opcional chamada no inicio, no fim e periodicamente durante a execucao com um
+        dicionario contendo a iteracao, a temperatura, a pontuacao atual, a melhor pontuacao e a quantidade de reinicios
+        :param progress_interval: intervalo minimo, em segundos, entre duas chamadas periodicas de progress_callback. O
+        relogio so e consultado a cada 256 iteracoes para nao encarecer o laco principal
+        :param time_budget: tempo maximo de execucao, em segundos, por padrao o informado no construtor. Assim como o
+        intervalo de progresso, o prazo so e verificado a cada 256 iteracoes
+        :param max_iterations: quantidade maxima de iteracoes, por padrao a informada no construtor
+        :return best_state, best_score: uma tupla contendo o estado de maior pontuacao visto durante a execucao e a sua
+        pontuacao, idealmente, essa pontuacao deve valer 1, consequentemente, o estado retornado deve conter o Sudoku
+        resolvido. Os contadores da execucao, incluindo o indicador solved, ficam disponiveis no atributo stats
         """
 
+        stats, deadline, iterations_limit = self._start_solve(time_budget, max_iterations)
+        start_time: float = time.perf_counter()
         current_state: State = self.__generate_first_state()
         current_score: float = current_state.get_score()
-        initial_temperature = 50000
+        best_score: float = current_score
+        # o melhor tabuleiro visto e copiado para um buffer preenchido no lugar, sem alocar um novo vetor por melhora
+        best_cells = current_state.sudoku_problem.cells.copy()
+        has_moves: bool = self.has_moves()
+        initial_temperature = self.initial_temperature
+        if initial_temperature is None:
+            initial_temperature = self.__calibrate_temperature(current_state, current_score) if has_moves else 0
         temperature = initial_temperature
+        self.cooling_schedule.start(temperature)
         stale_points = 0
-      
+        iteration: int = 0
+        restarts: int = 0
+        next_report_time: float = time.monotonic() + progress_interval
+
+        def update_stats():
+            stats.iterations = iteration
+            stats.restarts = restarts
+            stats.best_score = best_score
+            stats.solved = best_score == 1
+            stats.elapsed = time.perf_counter() - start_time
+
+        def report_progress():
+            update_stats()
+            progress_callback({
+                "iteration": iteration,
+                "temperature": temperature,
+                "score": current_score,
+                "best_score": best_score,
+                "restarts": restarts,
+            })
+
+        if progress_callback is not None:
+            report_progress()
+
+        if not has_moves:
+            stats.stop_reason = "solved" if current_score == 1 else "no_moves"
+            update_stats()
+            return current_state, current_score
+
         print("\n\nResolvendo...\n\n")
-        while temperature > 0 and current_score != 1:
-            possible_best_state: State = State(copy.deepcopy(current_state.sudoku_problem))
-            possible_best_state.disturb(self.fixed_positions_dict)
-            possible_best_score = possible_best_state.get_score()
+        while temperature > 0 and current_score != 1 and iteration < iterations_limit:
+            iteration += 1
+            if stats.collect_timings:
+                # a atualizacao incremental das contagens acontece dentro da troca e e contabilizada em disturb_time
+                disturb_start: float = time.perf_counter()
+                current_state.disturb(self.move_sampler)
+                scoring_start: float = time.perf_counter()
+                possible_best_score = current_state.get_score()
+                stats.disturb_time += scoring_start - disturb_start
+                stats.scoring_time += time.perf_counter() - scoring_start
+            else:
+                possible_best_score = current_state.propose_move(self.move_sampler)
             delta_score = possible_best_score - current_score
             accept_new_state: bool = False
 
             if delta_score > 0:
                 accept_new_state = True
                 stale_points = 0
-            elif exp(delta_score / temperature) > random.random():
+            elif exp(delta_score / temperature) > self.move_sampler.next_uniform():
                 accept_new_state = True
             if accept_new_state:
+                if delta_score < 0:
+                    stats.accepted_uphill += 1
+                else:
+                    stats.accepted_downhill += 1
+                current_state.accept_move()
                 current_score = possible_best_score
-                current_state = possible_best_state
+                if current_score > best_score:
+                    best_score = current_score
+                    best_cells[:] = current_state.sudoku_problem.cells
             else:
+                current_state.reject_move()
+                stats.rejected += 1
                 stale_points += 1
 
             if stale_points > self.stale_limit:
-                temperature = initial_temperature
-                current_state = self.__generate_first_state()
-                current_score = current_state.get_score()
+                temperature = self.reheat_policy.reheat_temperature(temperature, initial_temperature)
+                self.cooling_schedule.start(temperature)
+                if self.reheat_policy.restart_state:
+                    current_state = self.__generate_first_state()
+                    current_score = current_state.get_score()
+                    if current_score > best_score:
+                        best_score = current_score
+                        best_cells[:] = current_state.sudoku_problem.cells
                 stale_points = 0
+                restarts += 1
+
+            temperature = self.cooling_schedule.next_temperature(temperature, accept_new_state)
+
+            if iteration & 255 == 0:
+                now: float = time.monotonic()
+                if now >= deadline:
+                    break
+                if progress_callback is not None and now >= next_report_time:
+                    report_progress()
+                    next_report_time = now + progress_interval
 
-            temperature *= 0.6
+        if current_score == 1:
+            stats.stop_reason = "solved"
+        elif temperature <= 0:
+            stats.stop_reason = "frozen"
+        elif iteration >= iterations_limit:
+            stats.stop_reason = "max_iterations"
+        else:
+            stats.stop_reason = "time_budget"
+        update_stats()
+        if progress_callback is not None:
+            report_progress()
 
+        if best_score > current_score:
+            return State(Sudoku.from_cells(best_cells)), best_score
         return current_state, current_score
+
+    def solve_parallel(self, chains: int = None, processes: int = None) -> Tuple[State, float]:
+        """ Executa varias cadeias independentes da tempera simulada em um conjunto de processos, cada uma com uma
+        semente distinta derivada da semente do solucionador. Assim que alguma cadeia resolve o Sudoku as demais sao
+        canceladas. O limite de tempo do construtor vale para o conjunto das cadeias: as que excedem a quantidade de
+        processos e so comecam depois de outras terminarem recebem apenas o tempo restante
+        :param chains: quantidade de cadeias independentes, por padrao uma por nucleo de processamento
+        :param processes: quantidade de processos utilizados, por padrao o menor valor entre cadeias e nucleos
+        :return best_state, best_score: uma tupla contendo o estado de maior pontuacao entre as cadeias finalizadas e
+        a sua pontuacao. Os contadores dessa cadeia ficam disponiveis no atributo stats
+        """
+
+        cpu_count: int = os.cpu_count() or 1
+        chains = chains or cpu_count
+        processes = processes or min(chains, cpu_count)
+
+        # as sementes das cadeias sao derivadas com o SeedSequence do numpy, que garante sequencias independentes
+        chains_seeds: List[int] = [
+            int(chain_seed.generate_state(1)[0]) for chain_seed in np.random.SeedSequence(self.seed).spawn(chains)
+        ]
+        # o prazo e um instante do relogio de time.monotonic, compartilhado entre os processos do mesmo sistema
+        deadline: float = time.monotonic() + self.time_budget if self.time_budget is not None else None
+        chains_args: List[Tuple[SimulatedAnnealingSudokuSolver, int, float]] = [
+            (self, seed, deadline) for seed in chains_seeds
+        ]
+
+        best_state: State = None
+        best_score: float = -1
+        # ao sair do bloco with o conjunto de processos e terminado, interrompendo as cadeias ainda em execucao
+        with multiprocessing.Pool(processes) as pool:
+            for chain_state, chain_score, chain_stats in pool.imap_unordered(_solve_chain, chains_args):
+                if chain_score > best_score:
+                    best_state, best_score = chain_state, chain_score
+                    self.stats = chain_stats
+                if best_score == 1:
+                    break
+
+        return best_state, best_score
+
+
+def _solve_chain(chain_args: Tuple[SimulatedAnnealingSudokuSolver, int, float]) -> Tuple[State, float, SolverStats]:
+    """ Executa uma cadeia da tempera simulada dentro de um processo do conjunto criado por solve_parallel
+    :param chain_args: tupla contendo uma copia do solucionador, a semente aleatoria da cadeia e o prazo comum a todas
+    as cadeias, None quando nao ha limite de tempo
+    :return state, score, stats: resultado e contadores da cadeia
+    """
+
+    solver, seed, deadline = chain_args
+    solver.set_seed(seed)
+    # uma cadeia iniciada apos o prazo recebe tempo zero e retorna apenas o seu estado inicial
+    time_budget: float = max(deadline - time.monotonic(), 0) if deadline is not None else None
+    state, score = solver.solve(time_budget=time_budget)
+    return state, score, solver.stats
@@ -0,0 +1,143 @@
+"""Cache de solucoes de Sudoku indexado pela forma canonica do problema
+
+Dois Sudokus sao considerados equivalentes quando um pode ser obtido a partir do outro trocando os rotulos dos digitos,
+permutando as faixas horizontais de submatrizes, permutando as faixas verticais de submatrizes e transpondo o
+tabuleiro. Todas essas transformacoes preservam as regras do jogo, entao a solucao de um Sudoku pode ser levada para
+qualquer Sudoku equivalente aplicando a transformacao inversa. Como a quantidade de permutacoes de faixas cresce com o
+fatorial da ordem, para Sudokus de ordem maior que MAX_PERMUTED_ORDER apenas a transposicao e os rotulos sao
+considerados.
+"""
+
+import itertools
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional
+from numpy import array
+import numpy as np
+
+from sudoku import Sudoku, SudokuLayout
+
+# maior ordem para a qual as permutacoes de faixas entram na forma canonica, (n!)^2 * 2 transformacoes por Sudoku
+MAX_PERMUTED_ORDER: int = 4
+
+
+@lru_cache(maxsize=None)
+def get_transforms(order: int) -> array:
+    """ Monta, uma unica vez por ordem, a tabela com todas as transformacoes consideradas na forma canonica
+    :param order: ordem do Sudoku
+    :return transforms: matriz de formato (T, n^4) em que a linha k indica, para cada celula do tabuleiro transformado,
+    o indice da celula de origem no tabuleiro original. T vale 72 para o Sudoku tradicional
+    """
+
+    size: int = order * order
+    grid: array = np.arange(size * size).reshape(size, size)
+    if order > MAX_PERMUTED_ORDER:
+        return np.array([grid.reshape(-1), grid.T.reshape(-1)])
+
+    transforms: List[array] = []
+    for bands in itertools.permutations(range(order)):
+        rows: List[int] = [order * band + row for band in bands for row in range(order)]
+        for stacks in itertools.permutations(range(order)):
+            columns: List[int] = [order * stack + column for stack in stacks for column in range(order)]
+            transformed: array = grid[rows][:, columns]
+            transforms.append(transformed.reshape(-1))
+            transforms.append(transformed.T.reshape(-1))
+    return np.array(transforms)
+
+
+class CanonicalForm:
+    def __init__(self, key: bytes, transform: array, labels: array):
+        # tabuleiro canonico serializado, utilizado como chave do cache
+        self.key: bytes = key
+        # indices que levam o tabuleiro original para a orientacao canonica
+        self.transform: array = transform
+        # labels[d] e o rotulo canonico do digito d, com labels[0] = 0
+        self.labels: array = labels
+
+    def to_canonical(self, cells: array) -> array:
+        """ Leva um tabuleiro na orientacao original para a orientacao canonica
+        :param cells: tabuleiro achatado na orientacao original
+        :return canonical_cells: tabuleiro achatado na orientacao canonica
+        """
+
+        return self.labels[cells[self.transform]]
+
+    def from_canonical(self, canonical_cells: array) -> array:
+        """ Leva um tabuleiro na orientacao canonica de volta para a orientacao original
+        :param canonical_cells: tabuleiro achatado na orientacao canonica
+        :return cells: tabuleiro achatado na orientacao original
+        """
+
+        digits: array = np.argsort(self.labels).astype(np.uint8)
+        cells: array = np.empty(len(self.transform), dtype=np.uint8)
+        cells[self.transform] = digits[canonical_cells]
+        return cells
+
+
+def canonical_form(sudoku: Sudoku) -> CanonicalForm:
+    """ Calcula a forma canonica de um Sudoku. Para cada transformacao os digitos sao renomeados pela ordem da sua
+    primeira ocorrencia e o menor tabuleiro resultante, em ordem lexicografica, e escolhido como forma canonica
+    :param sudoku: Sudoku a ser normalizado
+    :return form: objeto do tipo CanonicalForm com a chave do cache e a transformacao utilizada
+    """
+
+    layout: SudokuLayout = sudoku.layout
+    transforms: array = get_transforms(sudoku.order)
+    candidates: array = sudoku.cells[transforms]
+    occurrences: array = candidates[:, :, np.newaxis] == layout.digits
+    # posicao da primeira ocorrencia de cada digito, digitos ausentes ficam no fim mantendo a ordem natural
+    first_positions: array = np.where(
+        occurrences.any(axis=1), occurrences.argmax(axis=1), layout.cells_count + layout.digits
+    )
+    labels: array = np.zeros((len(transforms), layout.size + 1), dtype=np.uint8)
+    labels[:, 1:] = np.argsort(np.argsort(first_positions, axis=1), axis=1) + 1
+    relabeled: array = np.take_along_axis(labels, candidates.astype(np.intp), axis=1)
+
+    keys: List[bytes] = [row.tobytes() for row in relabeled]
+    best: int = min(range(len(keys)), key=keys.__getitem__)
+    return CanonicalForm(keys[best], transforms[best], labels[best])
+
+
+class SolutionCache:
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries: int = max_entries
+        # solucoes na orientacao canonica, ordenadas da menos para a mais recentemente utilizada
+        self.__entries: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, form: CanonicalForm) -> Optional[Sudoku]:
+        """ Busca a solucao de um Sudoku equivalente ao informado
+        :param form: forma canonica do Sudoku buscado
+        :return solution: Sudoku resolvido na orientacao do Sudoku buscado, ou None caso nao esteja no cache
+        """
+
+        with self.__lock:
+            canonical_solution: array = self.__entries.get(form.key)
+            if canonical_solution is None:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(form.key)
+            self.hits += 1
+
+        return Sudoku.from_cells(form.from_canonical(canonical_solution))
+
+    def put(self, form: CanonicalForm, solution: Sudoku):
+        """ Armazena a solucao de um Sudoku, descartando a entrada menos recentemente utilizada caso o limite de
+        entradas seja ultrapassado
+        :param form: forma canonica do Sudoku resolvido
+        :param solution: Sudoku resolvido na orientacao original
+        :return None
+        """
+
+        canonical_solution: array = form.to_canonical(solution.cells)
+        with self.__lock:
+            self.__entries[form.key] = canonical_solution
+            self.__entries.move_to_end(form.key)
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
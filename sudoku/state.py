@@ -2,34 +2,67 @@
 """
 
 
-import random
-from typing import List, Dict
+from typing import Tuple
+from moves import MoveSampler
 from sudoku import Sudoku
 
 
 class State:
     def __init__(self, sudoku_problem: Sudoku):
         self.sudoku_problem = sudoku_problem
+        # ultima troca aplicada por propose_move e ainda nao aceita ou rejeitada, no formato (celula1, celula2) com os
+        # indices das celulas no tabuleiro achatado
+        self.pending_move: Tuple[int, int] = None
 
-    def disturb(self, fixed_positions_dict: Dict[int, List[int]]):
-        """ Causa uma modficacao no estado atual trocando, aleatoriamente, duas celulas de lugar
-        :param fixed_positions_dict: dicionario indicando quais as celulas sao fixas em cada submatriz
+    def disturb(self, move_sampler: MoveSampler):
+        """ Causa uma modficacao no estado atual trocando, aleatoriamente, duas celulas livres de uma mesma submatriz
+        :param move_sampler: objeto que sorteia as trocas a partir da tabela de trocas validas do Sudoku
         :return None, o atributo sudoku_problem do objeto e alterado diretamente dentro do metodo
         """
 
-        sub_board_index: int = random.choice([index for index in range(9)])
-        sub_board_fixed_positions: List[int] = fixed_positions_dict[sub_board_index]
-        swappable_cells = [x for x in range(9) if x not in sub_board_fixed_positions]
+        cell1, cell2 = move_sampler.next_swap()
+        sudoku: Sudoku = self.sudoku_problem
+        # politica direcionada aos conflitos: novas trocas sao sorteadas enquanto nenhuma das celulas tiver o seu
+        # digito repetido na propria linha ou coluna, ate o limite de tentativas do sorteador
+        attempts: int = move_sampler.conflict_attempts
+        while attempts > 0 and not (sudoku.is_in_conflict(cell1) or sudoku.is_in_conflict(cell2)):
+            cell1, cell2 = move_sampler.next_swap()
+            attempts -= 1
 
-        block1_position, block2_position = random.sample(swappable_cells, 2)
+        sudoku.swap_cells(cell1, cell2)
+        self.pending_move = (cell1, cell2)
 
-        chosen_board = self.sudoku_problem.boards[sub_board_index]
-        chosen_board[block1_position // 3, block1_position % 3], chosen_board[
-            block2_position // 3, block2_position % 3
-        ] = (
-            chosen_board[block2_position // 3, block2_position % 3],
-            chosen_board[block1_position // 3, block1_position % 3],
-        )
+    def propose_move(self, move_sampler: MoveSampler) -> float:
+        """ Aplica, no proprio estado, uma perturbacao aleatoria e retorna a qualidade resultante. A troca fica pendente
+        ate que seja confirmada com accept_move ou desfeita com reject_move, evitando copiar o estado a cada iteracao
+        :param move_sampler: objeto que sorteia as trocas a partir da tabela de trocas validas do Sudoku
+        :return proposed_score: qualidade do estado apos a perturbacao
+        """
+
+        self.disturb(move_sampler)
+        proposed_score: float = self.get_score()
+        return proposed_score
+
+    def accept_move(self):
+        """ Confirma a troca pendente, que passa a fazer parte do estado
+        :param None
+        :return None
+        """
+
+        self.pending_move = None
+
+    def reject_move(self):
+        """ Desfaz a troca pendente, restaurando o tabuleiro e as contagens de digitos anteriores a perturbacao
+        :param None
+        :return None
+        """
+
+        if self.pending_move is None:
+            return
+
+        cell1, cell2 = self.pending_move
+        self.sudoku_problem.swap_cells(cell1, cell2)
+        self.pending_move = None
 
     def get_score(self) -> float:
         """ Retorna a quantidade de elemento unicos em uma linha
@@ -37,7 +70,7 @@ class State:
         :return state_score: qualidade do Sudoku deste objeto baseado na heuristica de quantidade de valores unicos
         em cada linha e coluna
         """
-        state_score: float = self.sudoku_problem.calculate_fitness()
+        state_score: float = self.sudoku_problem.get_fitness()
         return state_score
 
     def __str__(self):
@@ -0,0 +1,134 @@
+"""Contadores de execucao dos solucionadores de Sudoku
+
+SolverStats acumula os contadores de uma unica resolucao e fica disponivel no atributo stats do solucionador apos
+solve. SolverMetrics agrega as resolucoes atendidas pela API e as exporta no formato de texto do Prometheus.
+"""
+
+import threading
+from typing import Dict, List
+
+
+class SolverStats:
+    def __init__(self, collect_timings: bool = False):
+        # semente aleatoria utilizada na resolucao, None para solucionadores deterministicos
+        self.seed: int = None
+        self.iterations: int = 0
+        # perturbacoes aceitas que pioram a pontuacao (sobem na energia), aceitas pelo criterio de e^(delta/T)
+        self.accepted_uphill: int = 0
+        # perturbacoes aceitas que nao pioram a pontuacao (descem na energia ou a mantem)
+        self.accepted_downhill: int = 0
+        self.rejected: int = 0
+        # reinicios disparados por estagnacao, apos stale_limit iteracoes sem melhora
+        self.restarts: int = 0
+        # trocas de temperatura entre replicas vizinhas da tempera paralela, tentadas e aceitas
+        self.exchanges: int = 0
+        self.accepted_exchanges: int = 0
+        # melhor pontuacao obtida, se o Sudoku foi resolvido e o motivo da parada ("solved", "frozen" quando a
+        # temperatura chega a 0, "time_budget", "max_iterations" ou "no_moves" quando nao ha trocas possiveis)
+        self.best_score: float = 0
+        self.solved: bool = False
+        self.stop_reason: str = None
+        # tempo total da resolucao, em segundos
+        self.elapsed: float = 0
+        # a medicao do tempo gasto em cada etapa consulta o relogio algumas vezes por iteracao, por isso e opcional
+        self.collect_timings: bool = collect_timings
+        self.disturb_time: float = 0
+        self.scoring_time: float = 0
+        self.copy_time: float = 0
+
+    def to_dict(self) -> Dict:
+        """ Retorna os contadores em um dicionario serializavel em JSON
+        :param None
+        :return stats: dicionario com os contadores, os tempos por etapa so sao incluidos quando medidos
+        """
+
+        stats: Dict = {
+            "seed": self.seed,
+            "iterations": self.iterations,
+            "accepted_uphill": self.accepted_uphill,
+            "accepted_downhill": self.accepted_downhill,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+            "exchanges": self.exchanges,
+            "accepted_exchanges": self.accepted_exchanges,
+            "elapsed": self.elapsed,
+            "best_score": self.best_score,
+            "solved": self.solved,
+            "stop_reason": self.stop_reason,
+        }
+        if self.collect_timings:
+            stats["timings"] = {
+                "disturb": self.disturb_time,
+                "scoring": self.scoring_time,
+                "copy": self.copy_time,
+            }
+        return stats
+
+
+class SolverMetrics:
+    # contadores de SolverStats exportados, com o nome da metrica e os rotulos adicionais de cada um
+    COUNTERS: List = [
+        ("iterations", "sudoku_solver_iterations_total", ""),
+        ("accepted_uphill", "sudoku_solver_accepted_moves_total", 'direction="uphill"'),
+        ("accepted_downhill", "sudoku_solver_accepted_moves_total", 'direction="downhill"'),
+        ("rejected", "sudoku_solver_rejected_moves_total", ""),
+        ("restarts", "sudoku_solver_restarts_total", ""),
+        ("exchanges", "sudoku_solver_replica_exchanges_total", 'result="attempted"'),
+        ("accepted_exchanges", "sudoku_solver_replica_exchanges_total", 'result="accepted"'),
+        ("elapsed", "sudoku_solver_seconds_total", 'phase="total"'),
+        ("disturb_time", "sudoku_solver_seconds_total", 'phase="disturb"'),
+        ("scoring_time", "sudoku_solver_seconds_total", 'phase="scoring"'),
+        ("copy_time", "sudoku_solver_seconds_total", 'phase="copy"'),
+    ]
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        # contagens de resolucoes e totais dos contadores, indexados pelo nome do solucionador
+        self.__solves: Dict[str, int] = dict()
+        self.__solved: Dict[str, int] = dict()
+        self.__totals: Dict[str, Dict[str, float]] = dict()
+
+    def record(self, engine: str, stats: SolverStats, solved: bool):
+        """ Acumula os contadores de uma resolucao
+        :param engine: nome do solucionador utilizado
+        :param stats: contadores da resolucao
+        :param solved: indica se o Sudoku foi resolvido
+        :return None
+        """
+
+        with self.__lock:
+            self.__solves[engine] = self.__solves.get(engine, 0) + 1
+            self.__solved[engine] = self.__solved.get(engine, 0) + solved
+            totals: Dict[str, float] = self.__totals.setdefault(engine, dict())
+            for attribute, _, _ in SolverMetrics.COUNTERS:
+                totals[attribute] = totals.get(attribute, 0) + getattr(stats, attribute)
+
+    def render(self, extra_metrics: Dict[str, float] = None) -> str:
+        """ Exporta as metricas acumuladas no formato de texto do Prometheus
+        :param extra_metrics: metricas adicionais sem rotulos, no formato nome: valor
+        :return text: metricas agrupadas por nome, cada grupo precedido da sua declaracao de tipo
+        """
+
+        samples: Dict[str, List[str]] = dict()
+        with self.__lock:
+            for engine in sorted(self.__solves):
+                engine_label: str = 'engine="{}"'.format(engine)
+                samples.setdefault("sudoku_solves_total", []).append(
+                    "{{{}}} {}".format(engine_label, self.__solves[engine])
+                )
+                samples.setdefault("sudoku_solved_total", []).append(
+                    "{{{}}} {}".format(engine_label, self.__solved[engine])
+                )
+                for attribute, name, labels in SolverMetrics.COUNTERS:
+                    samples.setdefault(name, []).append("{{{}}} {}".format(
+                        engine_label + ("," + labels if labels else ""), self.__totals[engine][attribute]
+                    ))
+
+        for name, value in (extra_metrics or dict()).items():
+            samples.setdefault(name, []).append(" {}".format(value))
+
+        lines: List[str] = []
+        for name, name_samples in samples.items():
+            lines.append("# TYPE {} {}".format(name, "counter" if name.endswith("_total") else "gauge"))
+            lines.extend(name + sample for sample in name_samples)
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,101 @@
+"""Base comum aos solucionadores estocasticos de Sudoku
+
+A tempera simulada e a tempera paralela partem da mesma preparacao do problema: a propagacao opcional das restricoes,
+as celulas livres e os digitos ausentes de cada submatriz e a tabela de trocas validas. Ambas tambem compartilham o
+tratamento da semente aleatoria, dos contadores de execucao e dos limites de tempo e de iteracoes de solve, que ficam
+concentrados em StochasticSudokuSolver.
+"""
+
+import secrets
+import time
+from typing import List, Tuple
+
+from moves import SwapTable
+from stats import SolverStats
+from sudoku import Sudoku
+
+
+class StochasticSudokuSolver:
+    def __init__(
+        self,
+        initial_sudoku_problem: Sudoku,
+        presolve: bool = True,
+        collect_timings: bool = False,
+        seed: int = None,
+        time_budget: float = None,
+        max_iterations: int = None,
+    ):
+        self.initial_sudoku_problem = initial_sudoku_problem.copy()
+        if presolve:
+            # as celulas deduzidas pela propagacao passam a ser fixas, reduzindo o espaco de busca
+            self.initial_sudoku_problem.propagate_constraints()
+        self.__find_missing_digits()
+        # todas as trocas validas sao calculadas uma unica vez, cada perturbacao apenas sorteia um indice da tabela
+        self.swap_table: SwapTable = SwapTable(self.sub_boards_free_cells)
+        # os geradores de numeros aleatorios de cada solucionador sao reiniciados a partir de seed a cada chamada de
+        # solve, de modo que a mesma semente reproduz exatamente a mesma execucao. Sem semente, uma e sorteada
+        self.seed: int = seed if seed is not None else secrets.randbits(32)
+        # contadores da ultima resolucao, os tempos gastos em cada etapa so sao medidos quando collect_timings e
+        # verdadeiro, pois exigem consultar o relogio a cada iteracao
+        self.collect_timings = collect_timings
+        self.stats: SolverStats = SolverStats(collect_timings)
+        # limites padrao de solve, em segundos de relogio e em iteracoes. None indica ausencia de limite
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+
+    def __find_missing_digits(self):
+        """ Calcula, uma unica vez por Sudoku, as celulas livres e os digitos ausentes de cada submatriz, que sao
+        reutilizados a cada geracao de estado inicial
+        :param None
+        :return None, os atributos sub_boards_free_cells e sub_boards_missing_digits sao preenchidos
+        """
+
+        cells = self.initial_sudoku_problem.cells
+        self.sub_boards_free_cells: List[List[int]] = []
+        self.sub_boards_missing_digits: List[List[int]] = []
+        for sub_board_cells in self.initial_sudoku_problem.layout.sub_boards_cells.tolist():
+            sub_board_values: List[int] = cells[sub_board_cells].tolist()
+            self.sub_boards_free_cells.append([cell for cell in sub_board_cells if cells[cell] == 0])
+            self.sub_boards_missing_digits.append(
+                [digit for digit in range(1, self.initial_sudoku_problem.size + 1) if digit not in sub_board_values]
+            )
+
+    def has_moves(self) -> bool:
+        """ Verifica se alguma submatriz possui duas celulas livres, sem as quais nao ha trocas possiveis
+        :param None
+        :return has_moves: True caso a tabela de trocas nao esteja vazia
+        """
+
+        return len(self.swap_table) > 0
+
+    def set_seed(self, seed: int):
+        """ Substitui a semente do solucionador. As subclasses reiniciam tambem os seus geradores de numeros aleatorios
+        :param seed: nova semente
+        :return None
+        """
+
+        self.seed = seed
+
+    def _start_solve(
+        self, time_budget: float = None, max_iterations: int = None, default_max_iterations: int = None
+    ) -> Tuple[SolverStats, float, float]:
+        """ Prepara uma chamada de solve: reinicia os geradores a partir da semente, cria os contadores da execucao e
+        calcula os limites efetivos a partir dos recebidos e dos padroes do construtor
+        :param time_budget: tempo maximo recebido por solve, None para utilizar o do construtor
+        :param max_iterations: quantidade maxima de iteracoes recebida por solve, None para utilizar a do construtor
+        :param default_max_iterations: limite de iteracoes aplicado quando nem o tempo nem as iteracoes sao limitados
+        :return stats, deadline, iterations_limit: contadores da execucao, ja atribuidos a stats, instante de parada no
+        relogio de time.monotonic e quantidade maxima de iteracoes, infinitos quando nao ha limite
+        """
+
+        time_budget = time_budget if time_budget is not None else self.time_budget
+        max_iterations = max_iterations if max_iterations is not None else self.max_iterations
+        if time_budget is None and max_iterations is None:
+            max_iterations = default_max_iterations
+        deadline: float = time.monotonic() + time_budget if time_budget is not None else float("inf")
+        iterations_limit: float = max_iterations if max_iterations is not None else float("inf")
+
+        self.set_seed(self.seed)
+        self.stats = SolverStats(self.collect_timings)
+        self.stats.seed = self.seed
+        return self.stats, deadline, iterations_limit
@@ -1,74 +1,339 @@
 """Classe que modela uma instancia do Sudoku e metodos auxiliares
 """
 
-import operator
-from functools import reduce
+from functools import lru_cache
+from math import sqrt
 from typing import List, Dict
 from numpy import array
 import numpy as np
 
 
+# ordem das submatrizes de um Sudoku tradicional, com tabuleiro de 9x9 celulas
+DEFAULT_ORDER: int = 3
+
+# tipos de unidade do tabuleiro, na ordem em que aparecem em SudokuLayout.units_cells
+UNIT_KINDS: List[str] = ["row", "column", "sub_board"]
+
+
+class SudokuLayout:
+    """ Tabelas de indices pre-calculadas para um Sudoku de ordem n, cujo tabuleiro de n^2 x n^2 celulas e armazenado
+    linha a linha em um vetor achatado
+    """
+
+    def __init__(self, order: int):
+        self.order: int = order
+        # quantidade de linhas, colunas, submatrizes e digitos do tabuleiro
+        self.size: int = order * order
+        self.cells_count: int = self.size * self.size
+
+        self.cells_row: array = np.arange(self.cells_count) // self.size
+        self.cells_column: array = np.arange(self.cells_count) % self.size
+        self.cells_sub_board: array = order * (self.cells_row // order) + self.cells_column // order
+        # sub_boards_cells[b, p] e o indice no tabuleiro achatado da celula de posicao p da submatriz b
+        self.sub_boards_cells: array = (
+            np.arange(self.cells_count).reshape(order, order, order, order).transpose(0, 2, 1, 3)
+            .reshape(self.size, self.size)
+        )
+        self.digits: array = np.arange(1, self.size + 1)
+        # as unidades do tabuleiro (linhas, colunas e submatrizes), cada uma com os indices de suas celulas
+        grid: array = np.arange(self.cells_count).reshape(self.size, self.size)
+        self.units_cells: List[List[int]] = grid.tolist() + grid.T.tolist() + self.sub_boards_cells.tolist()
+        # cells_units[k, c] e o indice, na mesma numeracao de units_cells, da unidade do tipo k (linha, coluna e
+        # submatriz) que contem a celula c
+        self.cells_units: array = np.stack([
+            self.cells_row, self.size + self.cells_column, 2 * self.size + self.cells_sub_board
+        ])
+        # mascara de bits com todos os digitos do tabuleiro, o bit d representa o digito d
+        self.all_digits_mask: int = sum(1 << digit for digit in range(1, self.size + 1))
+
+
+@lru_cache(maxsize=None)
+def get_layout(order: int) -> SudokuLayout:
+    """ Retorna as tabelas de indices de um Sudoku de ordem n, calculadas uma unica vez por ordem
+    :param order: ordem das submatrizes, 3 para o Sudoku tradicional de 9x9 celulas
+    :return layout: objeto do tipo SudokuLayout
+    """
+
+    if order < 1:
+        raise ValueError("ordem de Sudoku invalida: {}".format(order))
+    return SudokuLayout(order)
+
+
+def order_from_cells_count(cells_count: int) -> int:
+    """ Retorna a ordem de um Sudoku a partir da quantidade de celulas do seu tabuleiro
+    :param cells_count: quantidade de celulas, n^4 para um Sudoku de ordem n
+    :return order: ordem das submatrizes do Sudoku
+    """
+
+    order: int = int(round(sqrt(sqrt(cells_count))))
+    if order < 1 or order ** 4 != cells_count:
+        raise ValueError("um tabuleiro de {} celulas nao corresponde a nenhum Sudoku".format(cells_count))
+    return order
+
+
+# formato compacto em texto: uma linha com um caractere por celula, o digito d e representado por DIGITS_CHARS[d] e as
+# celulas vazias por "0" ou ".". Letras permitem representar os digitos acima de 9 dos Sudokus de ordem 4 e 5
+DIGITS_CHARS: str = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# tabelas de conversao entre os caracteres do formato compacto e os digitos, 255 marca caracteres invalidos
+_CHARS_DIGITS: array = np.full(256, 255, dtype=np.uint8)
+_CHARS_DIGITS[np.frombuffer(DIGITS_CHARS.encode("ascii"), dtype=np.uint8)] = np.arange(len(DIGITS_CHARS))
+_CHARS_DIGITS[np.frombuffer(DIGITS_CHARS.lower().encode("ascii"), dtype=np.uint8)] = np.arange(len(DIGITS_CHARS))
+_CHARS_DIGITS[ord(".")] = 0
+_DIGITS_CHARS: array = np.frombuffer(DIGITS_CHARS.encode("ascii"), dtype=np.uint8)
+
+
 class Sudoku:
-    def __init__(self, boards: List[array]):
-        self.boards: List[array] = boards
+    def __init__(self, boards: List[array], order: int = DEFAULT_ORDER):
+        # as celulas ficam em um unico vetor contiguo de uint8, as submatrizes sao apenas visoes sobre ele. Quando as
+        # submatrizes sao informadas a ordem do Sudoku e deduzida a partir delas
+        self.cells: array = Sudoku.boards_to_cells(boards, order)
+        self.order: int = order_from_cells_count(len(self.cells))
+        self.size: int = self.order * self.order
+        self.layout: SudokuLayout = get_layout(self.order)
         # o dicionario auxilia a recuperar em tempo linear a qualidade de cada linha do Sudoku
         self.rows_quality_dict: Dict[int, int] = dict()
         # o dicionario auxilia a recuperar em tempo linear a qualidade de cada coluna do Sudoku
         self.columns_quality_dict: Dict[int, int] = dict()
+        # contagem de cada digito (0 a n^2) por linha e por coluna, mantida para que a pontuacao possa ser atualizada
+        # incrementalmente apos uma troca de celulas, sem recalcular o tabuleiro inteiro
+        self.rows_digits_count: array = None
+        self.columns_digits_count: array = None
+        self.total_rows_unique_occurrences: int = 0
+        self.total_columns_unique_occurrences: int = 0
+
+    @classmethod
+    def from_cells(cls, cells: array) -> "Sudoku":
+        """ Cria um Sudoku diretamente a partir do vetor achatado de celulas, sem passar pelo formato de submatrizes. A
+        ordem do Sudoku e deduzida a partir da quantidade de celulas
+        :param cells: vetor com as n^4 celulas do tabuleiro, linha a linha, com 0 representando celulas vazias
+        :return sudoku: objeto do tipo Sudoku que utiliza o proprio vetor recebido como tabuleiro
+        """
+
+        cells = np.ascontiguousarray(cells, dtype=np.uint8).reshape(-1)
+        sudoku: Sudoku = cls(None, order_from_cells_count(len(cells)))
+        sudoku.cells = cells
+        return sudoku
+
+    @classmethod
+    def from_string(cls, text: str) -> "Sudoku":
+        """ Cria um Sudoku a partir do formato compacto em texto, com um caractere por celula, linha a linha
+        :param text: texto com n^4 caracteres, "0" ou "." para celulas vazias e 1-9 seguidos de A-Z para os digitos
+        :return sudoku: objeto do tipo Sudoku
+        """
+
+        try:
+            codes: array = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+        except UnicodeEncodeError:
+            raise ValueError("o Sudoku em texto deve conter apenas caracteres ASCII")
+        cells: array = _CHARS_DIGITS[codes]
+        if (cells == 255).any():
+            raise ValueError("caractere invalido no Sudoku em texto")
+        return cls.__checked(cells)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Sudoku":
+        """ Cria um Sudoku a partir do formato compacto binario, com um byte por celula contendo o seu digito
+        :param data: sequencia de n^4 bytes, linha a linha, com 0 representando celulas vazias
+        :return sudoku: objeto do tipo Sudoku
+        """
+
+        return cls.__checked(np.frombuffer(data, dtype=np.uint8).copy())
+
+    @classmethod
+    def __checked(cls, cells: array) -> "Sudoku":
+        """ Cria um Sudoku a partir de um vetor de celulas recebido de fora, verificando o tamanho e os digitos
+        :param cells: vetor de uint8 com as celulas do tabuleiro
+        :return sudoku: objeto do tipo Sudoku
+        """
+
+        sudoku: Sudoku = cls.from_cells(cells)
+        if len(cells) and cells.max() > sudoku.size:
+            raise ValueError("digito invalido para um Sudoku de {} linhas: {}".format(sudoku.size, cells.max()))
+        return sudoku
+
+    def to_string(self) -> str:
+        """ Retorna o tabuleiro no formato compacto em texto, com "0" nas celulas vazias
+        :param None
+        :return text: texto com um caractere por celula, linha a linha
+        """
+
+        return _DIGITS_CHARS[self.cells].tobytes().decode("ascii")
+
+    def to_bytes(self) -> bytes:
+        """ Retorna o tabuleiro no formato compacto binario
+        :param None
+        :return data: sequencia com um byte por celula, linha a linha
+        """
+
+        return self.cells.tobytes()
+
+    @staticmethod
+    def boards_to_cells(boards: List[array], order: int = DEFAULT_ORDER) -> array:
+        """ Converte a lista de n^2 submatrizes nxn utilizada pela API para o vetor achatado de n^4 celulas
+        :param boards: lista com as submatrizes do tabuleiro, da esquerda para a direita e de cima para baixo
+        :param order: ordem do tabuleiro vazio criado quando boards e None, ignorada quando as submatrizes sao
+        informadas
+        :return cells: vetor de uint8 com as celulas do tabuleiro, linha a linha
+        """
+
+        if boards is None:
+            return np.zeros(order ** 4, dtype=np.uint8)
+
+        grid: array = np.asarray(boards)
+        order = grid.shape[-1] if grid.ndim == 3 else 0
+        if grid.shape != (order * order, order, order) or order == 0:
+            raise ValueError("o tabuleiro deve ser uma lista de n^2 submatrizes nxn, recebido formato {}".format(
+                grid.shape
+            ))
+        # a verificacao acontece antes da conversao para uint8, que transformaria digitos negativos ou acima de 255 em
+        # digitos aparentemente validos
+        if grid.min() < 0 or grid.max() > order * order:
+            raise ValueError("digito invalido para um Sudoku de {} linhas: {}".format(
+                order * order, grid.min() if grid.min() < 0 else grid.max()
+            ))
+
+        grid = grid.astype(np.uint8).reshape(order, order, order, order)
+        return np.ascontiguousarray(grid.transpose(0, 2, 1, 3)).reshape(order ** 4)
+
+    @property
+    def boards(self) -> List[array]:
+        """ Retorna o tabuleiro no formato de n^2 submatrizes nxn. Cada submatriz e uma visao sobre o vetor achatado, de
+        modo que alteracoes feitas nela sao refletidas no Sudoku
+        :param None
+        :return boards: lista com as submatrizes do tabuleiro
+        """
+
+        order: int = self.order
+        grid: array = self.cells.reshape(order, order, order, order).transpose(0, 2, 1, 3)
+        return [grid[sub_board // order, sub_board % order] for sub_board in range(self.size)]
+
+    def copy(self) -> "Sudoku":
+        """ Retorna uma copia do Sudoku contendo apenas o tabuleiro, as contagens sao recalculadas quando necessario
+        :param None
+        :return sudoku: novo objeto do tipo Sudoku com uma copia do vetor de celulas
+        """
+
+        return Sudoku.from_cells(self.cells.copy())
 
     def __str__(self):
-        res: str = "-" * 86 + "\n"
-        for row in range(9):
+        order: int = self.order
+        separator: str = "-" * (2 + 9 * self.size + order) + "\n"
+        res: str = separator
+        for row in range(self.size):
             res += "||"
-            sub_board = 3 * (row // 3)
-            for column in range(9):
-                cell_value: int = self.boards[sub_board][row % 3, column % 3]
+            for column, cell_value in enumerate(self.get_row(row)):
                 res += "  {x:^4}  |".format(
                     x=cell_value if cell_value != 0 else " ", end=" "
                 )
-                if column % 3 == 2:
+                if column % order == order - 1:
                     res += "|"
-                    sub_board += 1
 
-            res += "\n" + "-" * 86 + "\n"
-            if row % 3 == 2 and row != 8:
-                res += "-" * 86 + "\n"
+            res += "\n" + separator
+            if row % order == order - 1 and row != self.size - 1:
+                res += separator
 
         return res
 
+    def propagate_constraints(self) -> int:
+        """ Preenche as celulas vazias que podem ser deduzidas diretamente das regras do Sudoku, aplicando
+        repetidamente as tecnicas de candidato unico (a celula so aceita um digito) e de posicao unica (o digito so
+        cabe em uma celula da linha, coluna ou submatriz) ate que nenhuma nova celula seja deduzida. Caso uma
+        contradicao seja encontrada a propagacao e interrompida
+        :param None
+        :return filled_cells: quantidade de celulas preenchidas pela propagacao
+        """
+
+        cells: array = self.cells
+        layout: SudokuLayout = self.layout
+        all_digits_mask: int = layout.all_digits_mask
+        cells_row: List[int] = layout.cells_row.tolist()
+        cells_column: List[int] = layout.cells_column.tolist()
+        cells_sub_board: List[int] = layout.cells_sub_board.tolist()
+        rows_used: List[int] = [0] * self.size
+        columns_used: List[int] = [0] * self.size
+        sub_boards_used: List[int] = [0] * self.size
+        empty_cells: List[int] = []
+        for cell, value in enumerate(cells.tolist()):
+            if value == 0:
+                empty_cells.append(cell)
+            else:
+                rows_used[cells_row[cell]] |= 1 << value
+                columns_used[cells_column[cell]] |= 1 << value
+                sub_boards_used[cells_sub_board[cell]] |= 1 << value
+
+        def candidates_of(cell: int) -> int:
+            return all_digits_mask & ~(
+                rows_used[cells_row[cell]] | columns_used[cells_column[cell]] | sub_boards_used[cells_sub_board[cell]]
+            )
+
+        def place(cell: int, value: int):
+            cells[cell] = value
+            rows_used[cells_row[cell]] |= 1 << value
+            columns_used[cells_column[cell]] |= 1 << value
+            sub_boards_used[cells_sub_board[cell]] |= 1 << value
+
+        filled_cells: int = 0
+        progress: bool = True
+        while progress and empty_cells:
+            progress = False
+
+            # candidato unico
+            for cell in empty_cells:
+                candidates: int = candidates_of(cell)
+                if candidates == 0:
+                    return self.__finish_propagation(filled_cells)
+                if candidates & (candidates - 1) == 0:
+                    place(cell, candidates.bit_length() - 1)
+                    filled_cells += 1
+                    progress = True
+            empty_cells = [cell for cell in empty_cells if cells[cell] == 0]
+
+            # posicao unica
+            for unit_cells in layout.units_cells:
+                unit_empty_cells: List[int] = [cell for cell in unit_cells if cells[cell] == 0]
+                unit_candidates: List[int] = [candidates_of(cell) for cell in unit_empty_cells]
+                for digit in range(1, self.size + 1):
+                    digit_bit: int = 1 << digit
+                    places: List[int] = [
+                        cell
+                        for cell, candidates in zip(unit_empty_cells, unit_candidates)
+                        if candidates & digit_bit
+                    ]
+                    if len(places) == 1 and cells[places[0]] == 0 and candidates_of(places[0]) & digit_bit:
+                        place(places[0], digit)
+                        filled_cells += 1
+                        progress = True
+            empty_cells = [cell for cell in empty_cells if cells[cell] == 0]
+
+        return self.__finish_propagation(filled_cells)
+
+    def __finish_propagation(self, filled_cells: int) -> int:
+        """ Descarta as contagens de digitos caso a propagacao tenha alterado o tabuleiro
+        :param filled_cells: quantidade de celulas preenchidas pela propagacao
+        :return filled_cells: o mesmo valor recebido
+        """
+
+        if filled_cells > 0:
+            self.rows_digits_count = None
+            self.columns_digits_count = None
+        return filled_cells
+
     def get_row(self, row_index) -> array:
         """ Retorna uma linha do Sudoku
         :param row_index: indice da linha buscada
-        :return complete_row: um objeto do tipo array contendo os 9 elementos da linha buscada
+        :return complete_row: um objeto do tipo array contendo os n^2 elementos da linha buscada
         """
 
-        sub_board = 3 * (row_index // 3)
-        complete_row: array = []
-
-        for sub_board_index in range(3):
-            complete_row = np.concatenate(
-                (complete_row, self.boards[sub_board + sub_board_index][row_index % 3]),
-                axis=None,
-            )
+        complete_row: array = self.cells[self.size * row_index:self.size * (row_index + 1)]
         return complete_row
 
     def get_column(self, column_index) -> array:
         """ Retorna uma coluna do Sudoku
         :param column_index: indice da coluna buscada
-        :return complete_column: um objeto do tipo array contendo os 9 elementos da coluna buscada
+        :return complete_column: um objeto do tipo array contendo os n^2 elementos da coluna buscada
         """
 
-        sub_board = column_index // 3
-        complete_column: array = []
-
-        for sub_board_index in range(3):
-            complete_column = np.concatenate(
-                (
-                    complete_column,
-                    self.boards[3 * sub_board_index + sub_board][:, column_index % 3],
-                ),
-                axis=None,
-            )
+        complete_column: array = self.cells[column_index::self.size]
         return complete_column
 
     def get_row_score(self, row_index: int) -> int:
@@ -77,19 +342,8 @@ class Sudoku:
         :return row_score: um inteiro representando a quantidade elementos nao repetidos na linha
         """
 
-        complete_row = self.get_row(row_index)
-        row_list = list(complete_row)
-        row_score = reduce(
-            operator.add,
-            [
-                occurrence
-                for [value, occurrence] in [
-                    [n, row_list.count(n)] for n in row_list if n != 0
-                ]
-                if occurrence == 1
-            ],
-            0,
-        )
+        row_count: array = np.bincount(self.get_row(row_index), minlength=self.size + 1)
+        row_score: int = int(np.count_nonzero(row_count[1:] == 1))
         self.rows_quality_dict[row_index] = row_score
         return row_score
 
@@ -99,40 +353,196 @@ class Sudoku:
         :return column_score: um inteiro representando a quantidade elementos nao repetidos na coluna
         """
 
-        complete_column = self.get_column(column_index)
-        column_list = list(complete_column)
-        column_score = reduce(
-            operator.add,
-            [
-                occurrence
-                for [value, occurrence] in [
-                    [n, column_list.count(n)] for n in column_list if n != 0
-                ]
-                if occurrence == 1
-            ],
-            0,
-        )
+        column_count: array = np.bincount(self.get_column(column_index), minlength=self.size + 1)
+        column_score: int = int(np.count_nonzero(column_count[1:] == 1))
         self.columns_quality_dict[column_index] = column_score
         return column_score
 
     def calculate_fitness(self) -> float:
         """ Retorna a qualidade de um Sudoku, dada pela quantidade total de elementos unicos em cada linha e coluna
-        dividiso por 18, sendo um valor de ponto flutuante entre 0(pior caso) e 1(Sudoku resolvido)
+        dividiso por 2n^4, sendo um valor de ponto flutuante entre 0(pior caso) e 1(Sudoku resolvido)
         :param None
         :return fitness: um valor float representando o quao perto o Sudoku esta de ser resolvido, utilizando a
         heuristica de repeticoes em cada linha e coluna
         """
 
-        total_rows_unique_occurrences: int = 0
-        total_columns_unique_occurrences: int = 0
+        # contagem de todas as linhas e colunas em uma unica passada sobre o vetor de celulas
+        size: int = self.size
+        self.rows_digits_count = np.bincount(
+            self.layout.cells_row * (size + 1) + self.cells, minlength=size * (size + 1)
+        ).reshape(size, size + 1)
+        self.columns_digits_count = np.bincount(
+            self.layout.cells_column * (size + 1) + self.cells, minlength=size * (size + 1)
+        ).reshape(size, size + 1)
 
-        for index in range(9):
-            total_columns_unique_occurrences += self.get_column_score(index)
-            total_rows_unique_occurrences += self.get_row_score(index)
+        rows_quality: List[int] = np.count_nonzero(self.rows_digits_count[:, 1:] == 1, axis=1).tolist()
+        columns_quality: List[int] = np.count_nonzero(self.columns_digits_count[:, 1:] == 1, axis=1).tolist()
+        self.rows_quality_dict = dict(enumerate(rows_quality))
+        self.columns_quality_dict = dict(enumerate(columns_quality))
 
-        rows_score: float = total_rows_unique_occurrences / 9
-        columns_score: float = total_columns_unique_occurrences / 9
+        self.total_rows_unique_occurrences = sum(rows_quality)
+        self.total_columns_unique_occurrences = sum(columns_quality)
+
+        return self.get_fitness()
+
+    @staticmethod
+    def calculate_batch_fitness(grids: array) -> array:
+        """ Calcula a qualidade de varios tabuleiros de uma so vez, com a mesma heuristica de calculate_fitness. As
+        ocorrencias de cada digito por linha e por coluna sao obtidas a partir de uma codificacao one-hot dos
+        tabuleiros, sem lacos em Python sobre linhas e colunas
+        :param grids: matriz de formato (N, n^4) com um tabuleiro achatado por linha
+        :return fitness: vetor de N valores float entre 0(pior caso) e 1(Sudoku resolvido)
+        """
 
-        fitness: float = (rows_score + columns_score) / 18
+        grids = np.asarray(grids)
+        layout: SudokuLayout = get_layout(order_from_cells_count(grids.shape[-1]))
+        size: int = layout.size
+        one_hot: array = grids.reshape(-1, size, size, 1) == layout.digits
+        rows_digits_count: array = one_hot.sum(axis=2)
+        columns_digits_count: array = one_hot.sum(axis=1)
+
+        rows_score: array = np.count_nonzero(rows_digits_count == 1, axis=(1, 2)) / size
+        columns_score: array = np.count_nonzero(columns_digits_count == 1, axis=(1, 2)) / size
+
+        fitness: array = (rows_score + columns_score) / (2 * size)
+
+        return fitness
+
+    def get_fitness(self) -> float:
+        """ Retorna a qualidade do Sudoku a partir dos totais de elementos unicos mantidos pelo objeto, sem percorrer
+        o tabuleiro. Caso as contagens ainda nao existam, a qualidade e calculada por completo
+        :param None
+        :return fitness: um valor float entre 0(pior caso) e 1(Sudoku resolvido)
+        """
+
+        if self.rows_digits_count is None:
+            return self.calculate_fitness()
+
+        rows_score: float = self.total_rows_unique_occurrences / self.size
+        columns_score: float = self.total_columns_unique_occurrences / self.size
+
+        fitness: float = (rows_score + columns_score) / (2 * self.size)
 
         return fitness
+
+    def is_in_conflict(self, cell: int) -> bool:
+        """ Verifica, a partir das contagens de digitos mantidas pelo objeto, se o digito de uma celula se repete na
+        sua linha ou na sua coluna
+        :param cell: indice da celula no tabuleiro achatado
+        :return in_conflict: True caso o digito da celula apareca mais de uma vez na sua linha ou coluna
+        """
+
+        if self.rows_digits_count is None:
+            self.calculate_fitness()
+
+        value: int = self.cells[cell]
+        row, column = divmod(cell, self.size)
+        return self.rows_digits_count[row, value] > 1 or self.columns_digits_count[column, value] > 1
+
+    def find_conflicts(self) -> List[Dict]:
+        """ Encontra os digitos repetidos entre as celulas preenchidas de cada linha, coluna e submatriz
+        :param None
+        :return conflicts: lista de dicionarios com o tipo da unidade ("row", "column" ou "sub_board"), o seu indice, o
+        digito repetido e as celulas que o contem. Uma lista vazia indica que nao ha conflitos
+        """
+
+        conflicts: List[Dict] = []
+        for unit, digit in zip(*np.nonzero(self.__units_digits_count()[:, 1:] > 1)):
+            kind, index = divmod(int(unit), self.size)
+            conflicts.append({
+                "unit": UNIT_KINDS[kind],
+                "index": index,
+                "digit": int(digit) + 1,
+                "cells": np.flatnonzero((self.layout.cells_units[kind] == unit) & (self.cells == digit + 1)).tolist(),
+            })
+        return conflicts
+
+    def is_valid(self) -> bool:
+        """ Verifica se as celulas preenchidas respeitam as regras do Sudoku, sem digitos repetidos em nenhuma linha,
+        coluna ou submatriz. Nao garante que o Sudoku tenha solucao
+        :param None
+        :return valid: True caso nao haja conflitos entre as celulas preenchidas
+        """
+
+        return not (self.__units_digits_count()[:, 1:] > 1).any()
+
+    def __units_digits_count(self) -> array:
+        """ Conta as ocorrencias de cada digito em todas as unidades do tabuleiro com uma unica passada
+        :param None
+        :return units_digits_count: matriz de formato (3n^2, n^2 + 1) com uma linha por unidade, na ordem de
+        units_cells, em que a coluna d e a quantidade de ocorrencias do digito d
+        """
+
+        size: int = self.size
+        return np.bincount(
+            (self.layout.cells_units * (size + 1) + self.cells).ravel(), minlength=3 * size * (size + 1)
+        ).reshape(3 * size, size + 1)
+
+    def swap_cells(self, cell1: int, cell2: int):
+        """ Troca duas celulas de lugar e atualiza as contagens de digitos e a qualidade apenas das linhas e colunas
+        afetadas pela troca (no maximo duas linhas e duas colunas)
+        :param cell1: indice da primeira celula no tabuleiro achatado
+        :param cell2: indice da segunda celula no tabuleiro achatado
+        :return None, o tabuleiro e as contagens sao alterados diretamente dentro do metodo
+        """
+
+        cells: array = self.cells
+        value1: int = int(cells[cell1])
+        value2: int = int(cells[cell2])
+        cells[cell1] = value2
+        cells[cell2] = value1
+
+        if self.rows_digits_count is None or value1 == value2:
+            return
+
+        row1, column1 = divmod(cell1, self.size)
+        row2, column2 = divmod(cell2, self.size)
+
+        if row1 != row2:
+            self.total_rows_unique_occurrences += self.__replace_digit(
+                self.rows_digits_count, self.rows_quality_dict, row1, value1, value2
+            )
+            self.total_rows_unique_occurrences += self.__replace_digit(
+                self.rows_digits_count, self.rows_quality_dict, row2, value2, value1
+            )
+        if column1 != column2:
+            self.total_columns_unique_occurrences += self.__replace_digit(
+                self.columns_digits_count, self.columns_quality_dict, column1, value1, value2
+            )
+            self.total_columns_unique_occurrences += self.__replace_digit(
+                self.columns_digits_count, self.columns_quality_dict, column2, value2, value1
+            )
+
+    @staticmethod
+    def __replace_digit(
+        digits_count: array, quality_dict: Dict[int, int], line_index: int, old_value: int, new_value: int
+    ) -> int:
+        """ Substitui uma ocorrencia de um digito por outro em uma linha ou coluna, atualizando sua contagem de digitos
+        e sua qualidade
+        :param digits_count: matriz de contagem de digitos das linhas ou das colunas
+        :param quality_dict: dicionario de qualidade das linhas ou das colunas
+        :param line_index: indice da linha ou coluna alterada
+        :param old_value: digito que deixa a linha ou coluna
+        :param new_value: digito que entra na linha ou coluna
+        :return delta: variacao na quantidade de elementos unicos da linha ou coluna
+        """
+
+        line_count = digits_count[line_index]
+        delta: int = 0
+
+        if old_value != 0:
+            if line_count[old_value] == 1:
+                delta -= 1
+            elif line_count[old_value] == 2:
+                delta += 1
+        line_count[old_value] -= 1
+
+        if new_value != 0:
+            if line_count[new_value] == 0:
+                delta += 1
+            elif line_count[new_value] == 1:
+                delta -= 1
+        line_count[new_value] += 1
+
+        quality_dict[line_index] += delta
+        return delta
@@ -0,0 +1,52 @@
+"""Testes da forma canonica do cache de solucoes: Sudokus equivalentes por transposicao, permutacao de faixas e troca
+de rotulos devem ter a mesma chave, e a ida e volta pela orientacao canonica deve reproduzir o tabuleiro original
+"""
+
+import numpy as np
+import pytest
+
+from backtracking import BacktrackingSudokuSolver
+from generator import generate_puzzle
+from solution_cache import SolutionCache, canonical_form, get_transforms
+from sudoku import Sudoku
+
+
+def transformed(sudoku: Sudoku, rng: np.random.Generator) -> Sudoku:
+    """ Aplica ao Sudoku uma transformacao e uma troca de rotulos aleatorias
+    :param sudoku: Sudoku original
+    :param rng: gerador de numeros aleatorios
+    :return equivalent: Sudoku equivalente ao original
+    """
+
+    transforms = get_transforms(sudoku.order)
+    labels = np.concatenate([[0], rng.permutation(sudoku.size) + 1]).astype(np.uint8)
+    return Sudoku.from_cells(labels[sudoku.cells[transforms[rng.integers(len(transforms))]]])
+
+
+@pytest.mark.parametrize("order", [2, 3])
+def test_canonical_round_trip(order: int):
+    rng: np.random.Generator = np.random.default_rng(order)
+    for seed in range(5):
+        sudoku: Sudoku = transformed(generate_puzzle(order=order, seed=seed).puzzle, rng)
+        form = canonical_form(sudoku)
+        assert (form.from_canonical(form.to_canonical(sudoku.cells)) == sudoku.cells).all()
+        assert form.to_canonical(sudoku.cells).tobytes() == form.key
+
+
+@pytest.mark.parametrize("order", [2, 3])
+def test_equivalent_sudokus_share_key_and_solution(order: int):
+    rng: np.random.Generator = np.random.default_rng(order)
+    for seed in range(5):
+        generated = generate_puzzle(order=order, seed=seed)
+        cache: SolutionCache = SolutionCache()
+        cache.put(canonical_form(generated.puzzle), generated.solution)
+
+        for _ in range(5):
+            equivalent: Sudoku = transformed(generated.puzzle, rng)
+            form = canonical_form(equivalent)
+            assert form.key == canonical_form(generated.puzzle).key
+
+            # a solucao levada para a orientacao do Sudoku equivalente deve ser a sua unica solucao
+            solution: Sudoku = cache.get(form)
+            expected = BacktrackingSudokuSolver(equivalent).find_solutions(limit=1)[0]
+            assert solution.cells.tolist() == expected
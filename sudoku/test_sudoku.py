@@ -0,0 +1,86 @@
+"""Testes de Sudoku: a pontuacao incremental de swap_cells, que deve coincidir com o recalculo completo de
+calculate_fitness apos qualquer sequencia de trocas, a deteccao de conflitos e a leitura dos formatos de entrada
+"""
+
+import numpy as np
+import pytest
+
+from mocks import mock_medium1
+from sudoku import Sudoku
+
+
+@pytest.mark.parametrize("order", [2, 3, 4])
+def test_swap_cells_matches_full_fitness(order: int):
+    rng: np.random.Generator = np.random.default_rng(order)
+    size: int = order * order
+    sudoku: Sudoku = Sudoku.from_cells(rng.integers(1, size + 1, size ** 4))
+    sudoku.calculate_fitness()
+
+    for _ in range(500):
+        # trocas entre quaisquer celulas, incluindo celulas da mesma linha ou coluna e digitos iguais
+        cell1, cell2 = rng.integers(size ** 4, size=2).tolist()
+        sudoku.swap_cells(cell1, cell2)
+        expected: Sudoku = Sudoku.from_cells(sudoku.cells.copy())
+        assert sudoku.get_fitness() == expected.calculate_fitness()
+        assert (sudoku.rows_digits_count == expected.rows_digits_count).all()
+        assert (sudoku.columns_digits_count == expected.columns_digits_count).all()
+
+
+def test_swap_cells_undo_restores_fitness():
+    rng: np.random.Generator = np.random.default_rng(0)
+    sudoku: Sudoku = Sudoku.from_cells(rng.integers(1, 10, 81))
+    fitness: float = sudoku.calculate_fitness()
+
+    swaps = rng.integers(81, size=(200, 2)).tolist()
+    for cell1, cell2 in swaps:
+        sudoku.swap_cells(cell1, cell2)
+    for cell1, cell2 in reversed(swaps):
+        sudoku.swap_cells(cell1, cell2)
+    assert sudoku.get_fitness() == fitness
+
+
+def test_is_valid_and_find_conflicts():
+    sudoku: Sudoku = Sudoku(mock_medium1)
+    assert sudoku.is_valid()
+    assert sudoku.find_conflicts() == []
+
+    # a celula 0 fica na linha 0, na coluna 0 e na submatriz 0, e a celula 1 ja contem um 9
+    sudoku.cells[0] = 9
+    assert not sudoku.is_valid()
+    assert sudoku.find_conflicts() == [
+        {"unit": "row", "index": 0, "digit": 9, "cells": [0, 1]},
+        {"unit": "sub_board", "index": 0, "digit": 9, "cells": [0, 1]},
+    ]
+
+
+def test_text_and_bytes_round_trip():
+    sudoku: Sudoku = Sudoku(mock_medium1)
+    assert (Sudoku.from_string(sudoku.to_string()).cells == sudoku.cells).all()
+    assert (Sudoku.from_string(sudoku.to_string().replace("0", ".")).cells == sudoku.cells).all()
+    assert (Sudoku.from_bytes(sudoku.to_bytes()).cells == sudoku.cells).all()
+    assert (Sudoku.boards_to_cells(sudoku.boards) == sudoku.cells).all()
+
+
+# a primeira e a ultima celula do tabuleiro, pois um digito fora do intervalo nelas pode ser confundido com a contagem
+# de outra unidade ou alterar o total de contagens
+@pytest.mark.parametrize("position", [(0, 0, 0), (8, 2, 2)])
+@pytest.mark.parametrize("digit", [10, 265, -1])
+def test_boards_reject_out_of_range_digits(position: tuple, digit: int):
+    boards: np.ndarray = np.array(mock_medium1, dtype=np.int64)
+    boards[position] = digit
+    with pytest.raises(ValueError, match="digito invalido"):
+        Sudoku(boards)
+
+
+def test_parsers_reject_invalid_input():
+    text: str = Sudoku(mock_medium1).to_string()
+    with pytest.raises(ValueError, match="digito invalido"):
+        Sudoku.from_string("A" + text[1:])
+    with pytest.raises(ValueError, match="caractere invalido"):
+        Sudoku.from_string("?" + text[1:])
+    with pytest.raises(ValueError):
+        Sudoku.from_string(text[1:])
+    with pytest.raises(ValueError, match="digito invalido"):
+        Sudoku.from_bytes(bytes([10]) + bytes(80))
+    with pytest.raises(ValueError):
+        Sudoku([[[1, 2], [3, 4]]] * 3)